@@ -0,0 +1,63 @@
+import sys
+import json
+import subprocess
+import numpy as np
+
+# Import time of spectralGFD, each case in a fresh interpreter.
+# Fails if a case loads modules it should not (regression guard),
+# or takes longer than max_time (if given).
+# $python benchImport.py [max_time in s for `import spectralGFD`]
+
+# Params
+repeats = 5
+heavy = ['matplotlib', 'IPython', 'pandas', 'h5py', 'dedalus']
+cases = {  # statement: modules it must not load
+    'import spectralGFD': heavy,
+    'from spectralGFD import Lap_Cor': ['matplotlib', 'IPython', 'pandas'],
+    'from spectralGFD import time_PDE': ['matplotlib', 'IPython', 'pandas'],
+    'from spectralGFD import polar_plot': ['IPython', 'pandas', 'h5py',
+                                           'dedalus'],
+    'from spectralGFD import *': ['IPython'],
+}
+max_time = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+child = '''
+import sys, json, time
+time_0 = time.perf_counter()
+exec(sys.argv[1])
+time_tot = time.perf_counter() - time_0
+print(json.dumps({'time': time_tot, 'modules': sorted(
+    {name.split('.')[0] for name in sys.modules})}))
+'''
+
+
+def run_case(statement):
+    '''(import time, top level modules loaded) in a fresh interpreter'''
+    result = subprocess.run([sys.executable, '-c', child, statement],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{statement} failed:\n{result.stderr}')
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+    return output['time'], set(output['modules'])
+
+
+failed = []
+for statement, forbidden in cases.items():
+    times = []
+    for i in range(repeats):
+        import_time, modules = run_case(statement)
+        times.append(import_time)
+    loaded = sorted(set(forbidden) & modules)
+    print(f'{statement:<36} median {np.median(times)*1e3:8.1f} ms, '
+          f'min {np.min(times)*1e3:8.1f} ms'
+          + (f'  loads {loaded}' if loaded else ''))
+    if loaded:
+        failed.append(f'{statement} loads {loaded}')
+    if (statement == 'import spectralGFD' and max_time is not None
+            and np.median(times) > max_time):
+        failed.append(f'{statement} takes {np.median(times):.3f} s '
+                      f'> {max_time} s')
+
+if failed:
+    print('\nFAILED:\n' + '\n'.join(failed))
+    sys.exit(1)
@@ -0,0 +1,35 @@
+from spectralGFD import *
+
+# Compare batch solve (one factorisation) against a fresh
+# Lap_Cor per forcing
+
+# Params
+Ld = 1  # coriolis effect
+Nphi, Nr = 2**6, 2**7
+Lr = 1
+n_forcings = 50
+
+
+def scaled_q(phi, r, Ld, Lr=1, a=1):
+    return a * gaussian_q(phi, r, Ld, Lr=Lr)
+
+
+q_funcs = [partial(scaled_q, a=1 + k/n_forcings) for k in range(n_forcings)]
+
+# Per-forcing construction
+time_0 = time.perf_counter()
+single_list = [Lap_Cor(Nphi, Nr, q_func, Ld=Ld, Lr=Lr).ug
+               for q_func in q_funcs]
+single_time = time.perf_counter() - time_0
+
+# Batch
+time_0 = time.perf_counter()
+batch_lap = Lap_Cor(Nphi, Nr, q_funcs[0], Ld=Ld, Lr=Lr)
+batch_list = [np.copy(ug) for ug in batch_lap.solve_batch(q_funcs)]
+batch_time = time.perf_counter() - time_0
+
+max_diff = max(np.max(np.abs(a - b)) for a, b in zip(single_list, batch_list))
+print(f'{n_forcings} forcings at Nphi={Nphi}, Nr={Nr}')
+print(f'Per-forcing Lap_Cor: {single_time:.3f}s')
+print(f'Lap_Cor.solve_batch: {batch_time:.3f}s')
+print(f'Speedup: {single_time/batch_time:.1f}x, max difference: {max_diff:.2e}')
@@ -0,0 +1,60 @@
+from spectralGFD import *
+
+# File size, write time and single-frame read latency of HDF5
+# snapshot layouts (see set_file_layout) against the default layout
+
+# Params
+Nphi, Nr = 2**7, 2**7  # Grid spacing
+n = 3  # initial bessel
+timestep = np.pi/400
+stop_sim_time = np.pi/2
+save_every = 5
+scales = 3
+Lr = 1
+n_reads = 50  # Random frames read per layout
+
+layouts = {
+    'default': {},
+    'frame chunks': {'output_chunk_frames': 1},
+    'gzip 4': {'output_compression': 'gzip',
+               'output_compression_opts': 4},
+    'lzf': {'output_compression': 'lzf'},
+    'float32': {'output_dtype': np.float32, 'output_chunk_frames': 1},
+    'float32 lzf': {'output_dtype': np.float32,
+                    'output_compression': 'lzf'},
+    'psi only': {'output_tasks': ['psi'], 'output_chunk_frames': 1},
+}
+
+
+def initial_func(phi, r):
+    return bessel_q(phi, r, Ld=np.inf, n=n, Lr=Lr)
+
+
+rng = np.random.default_rng(0)
+rows = []
+for name, layout in layouts.items():
+    save_name = f'Bench layout {name}'
+    rotation = rotation_PDE(Nphi, Nr, initial_func, Lr=Lr,
+                            stop_sim_time=stop_sim_time, timestep=timestep,
+                            local=False, save_every=save_every,
+                            save_name=save_name, scales=scales, **layout)
+
+    # Cold single-frame reads (new reader, no frame cache)
+    reader = SnapshotReader(save_name, 'psi', cache_frames=0)
+    frames = rng.integers(len(reader), size=n_reads)
+    time_0 = time.perf_counter()
+    for k in frames:
+        reader[k]
+    read_time = (time.perf_counter() - time_0) / n_reads
+    reader.close()
+
+    rows.append({'layout': name,
+                 'size_MB': folder_size(f'saves/{save_name}') / 2**20,
+                 'write_time': rotation.perf['output_time'],
+                 'read_ms': 1e3 * read_time,
+                 'frames': len(reader)})
+    print(rows[-1])
+
+table = pd.DataFrame(rows)
+print(f'\nNphi={Nphi}, Nr={Nr}, scales={scales}')
+print(table.to_string(index=False, float_format='%.3f'))
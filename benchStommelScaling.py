@@ -0,0 +1,61 @@
+from spectralGFD import *
+import sys
+import json
+import subprocess
+
+# Strong scaling of the 256x256 Stommel case.
+# Driver:  $python benchStommelScaling.py
+# One run: $mpiexec -n N python benchStommelScaling.py run
+
+# Params
+Nphi, Nr = 256, 256  # Grid spacing
+n = 2  # initial bessel
+time_step = 6 * 60  # Time step
+timestepper = d3.SBDF3
+n_steps = 200
+stop_sim_time = n_steps * time_step  # Simulation length
+Lr = 2e6
+dealias = 2
+ranks_list = [1, 2, 4, 8]
+
+# Constants
+constants = {
+    'F' : 0.1,
+    'H' : 500,
+    'r0' : 2e-7,
+    'beta' : 2e-11,
+    'nu' : 80,
+    'rho0' : 1000,
+    'Q_shift' : 0.01}
+
+
+def zeta_init(phi, r):
+    return 1e-16 * partial(bessel, n=n, Lr=Lr)(phi, r)
+
+
+if len(sys.argv) > 1 and sys.argv[1] == 'run':
+    stommel_bessel = stommel_PDE(Nphi, Nr, [None, zeta_init, 0],
+                                 dealias=dealias,
+                                 stop_sim_time=stop_sim_time,
+                                 timestep=time_step,
+                                 timestepper=timestepper,
+                                 Lr=Lr,
+                                 local=True,
+                                 save_every=n_steps,
+                                 **constants)
+    if is_root():
+        print(json.dumps({'ranks': comm.size, 'time': stommel_bessel.time}))
+else:
+    times = {}
+    for ranks in ranks_list:
+        out = subprocess.run(['mpiexec', '-n', str(ranks), sys.executable,
+                              __file__, 'run'],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times[ranks] = result['time']
+
+    print(f'Stommel {Nphi}x{Nr}, {n_steps} steps')
+    print('ranks  time (s)  speedup  efficiency')
+    for ranks, t in times.items():
+        speedup = times[ranks_list[0]] / t
+        print(f'{ranks:5d}  {t:8.2f}  {speedup:7.2f}  {speedup/ranks:10.2f}')
@@ -0,0 +1,99 @@
+import sys
+import json
+import pytest
+from spectralGFD import *
+
+# Accuracy vs cost of Dedalus timesteppers on solid body rotation
+# (exact solution: initial field rotated by t, see rotation_PDE.exact)
+# $pytest benchTimesteppers.py [--benchmark-json=timesteppers.json]
+# prints the Pareto front and the cheapest run per target at the end;
+# $python benchTimesteppers.py timesteppers.json reprints it.
+
+# Params
+Lr = 1
+n = 3  # initial bessel
+stop_sim_time = np.pi / 2  # Quarter rotation
+resolutions = [2**5, 2**6, 2**7]  # Nphi = Nr
+steps_list = [25, 50, 100, 200, 400]  # Timesteps per quarter rotation
+timesteppers = [d3.SBDF1, d3.SBDF2, d3.SBDF3, d3.SBDF4,
+                d3.CNAB2, d3.MCNAB2, d3.RK222, d3.RK443]
+targets = [1e-2, 1e-3, 1e-4, 1e-5, 1e-6]  # L2 error
+rounds = 2  # Wall time = fastest round
+
+
+def initial_func(phi, r):
+    return bessel_q(phi, r, Ld=np.inf, n=n, Lr=Lr)
+
+
+def pareto(table, cost='time', error='error'):
+    '''Rows not beaten in both cost and error by another row'''
+    table = table.sort_values([cost, error])
+    best = np.minimum.accumulate(table[error].to_numpy())
+    keep = table[error].to_numpy() <= best
+    keep[1:] &= table[error].to_numpy()[1:] < best[:-1]
+    return table[keep]
+
+
+def report(rows):
+    '''Pareto front and cheapest run per target of the benchmark rows'''
+    table = pd.DataFrame(rows)
+    lines = ['Pareto front (wall time vs L2 error):',
+             pareto(table).to_string(index=False, float_format='%.3e'),
+             '', 'Cheapest run per target L2 error:']
+    for target in targets:
+        accurate = table[table['error'] <= target]
+        if len(accurate) == 0:
+            lines.append(f'{target:.0e}: none')
+            continue
+        row = accurate.loc[accurate['time'].idxmin()]
+        lines.append(f'{target:.0e}: {row["timestepper"]} N={row["N"]} '
+                     f'dt={row["dt"]:.3e} ({row["time"]:.3f}s, '
+                     f'error {row["error"]:.2e})')
+    return '\n'.join(lines)
+
+
+@pytest.fixture(scope='module')
+def rows(request):
+    '''Benchmark rows of the module, reported once all have run'''
+    rows = []
+    yield rows
+    if rows:
+        capture = request.config.pluginmanager.getplugin('capturemanager')
+        with capture.global_and_fixture_disabled():
+            print('\n\n' + report(rows))
+
+
+@pytest.mark.parametrize('N', resolutions, ids=lambda N: f'N{N}')
+@pytest.mark.parametrize('timestepper', timesteppers,
+                         ids=lambda timestepper: timestepper.__name__)
+@pytest.mark.parametrize('dt', [stop_sim_time / steps for steps in steps_list],
+                         ids=lambda dt: f'dt{dt:.2e}')
+def test_timestepper(benchmark, rows, N, timestepper, dt):
+    steps = round(stop_sim_time / dt)
+    benchmark.group = f'N={N}'
+    rotation = benchmark.pedantic(
+        rotation_PDE, args=(N, N, initial_func),
+        kwargs={'Lr': Lr, 'stop_sim_time': stop_sim_time, 'timestep': dt,
+                'timestepper': timestepper,
+                'save_every': steps},  # Only t=0 and end
+        rounds=rounds, iterations=1)
+    t_end = rotation.t_list[-1]
+    phi_mesh, r_mesh = np.meshgrid(rotation.phi, rotation.r, indexing='ij')
+    error = error_norms(rotation.q_list[-1],
+                        rotation.exact(phi_mesh, r_mesh, t_end),
+                        Lr, rotation.disk.alpha, ['L2'])['L2']
+    row = {'timestepper': timestepper.__name__, 'N': N,
+           'steps': rotation.iterations, 'dt': dt, 'error': error,
+           'time': benchmark.stats.stats.min,
+           'step_time': rotation.perf['step_time']}
+    benchmark.extra_info.update(row)
+    rows.append(row)
+    assert np.isfinite(error)
+
+
+if __name__ == '__main__':
+    # Report from a --benchmark-json file
+    with open(sys.argv[1]) as file:
+        benchmarks = json.load(file)['benchmarks']
+    print(report([entry['extra_info'] for entry in benchmarks
+                  if entry['name'].startswith('test_timestepper')]))
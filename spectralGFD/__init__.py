@@ -2,16 +2,94 @@
 # $export NUMEXPR_NUM_THREADS=1
 # $export OMP_NUM_THREADS=1
 
-from .plotting import *
-from .fileHandling import *
-from .basicSolver import *
-from .conformal import *
-from .laplaceCoriolis import *
-from .specialFunctions import *
-from .timeSolver import *
-from .rotationPDE import *
-from .stommelMunk import *
-
-import dedalus
-matplotlib.rcParams.update({'font.size': 16})
-print('Using Dedalus v', dedalus.__version__)
+'''
+Spectral GFD solvers on the disk with Dedalus.
+
+The public names are loaded lazily: `from spectralGFD import Lap_Cor`
+imports laplaceCoriolis and its dependencies only, so matplotlib,
+IPython, pandas (and the plotting, file handling modules) are loaded
+when first used. `from spectralGFD import *` loads every module, as in
+scripts. Importing the package prints nothing and leaves matplotlib's
+rcParams alone (the plotting module sets STYLE when imported).
+
+See benchImport.py for import times.
+'''
+import importlib
+
+# Module -> public names, in the order of the former star imports
+_MODULES = {
+    'parallel': ['comm', 'get_comm', 'use_comm', 'is_root', 'root_only',
+                 'bcast', 'default_mesh', 'global_grids'],
+    'figureOutput': ['FigureOutput', 'figure_output', 'set_headless',
+                     'is_headless', 'headless', 'show', 'clear_output'],
+    'polarGeometry': ['PolarGeometry', 'polar_geometry', 'func_on_mesh'],
+    'plotting': ['STYLE', 'test', 'im_plot', 'polar_plot', 'MAPPINGS',
+                 'PolarRegrid', 'polar_regrid', 'image_plot', 'animate'],
+    'fileHandling': ['file_sets', 'animate_file', 'time_plot_file',
+                     'load_diagnostics', 'plot_diagnostics_table',
+                     'plot_diagnostics_file', 'load_snapshot'],
+    'convergenceSweep': ['THREAD_VARS', 'grid_cases', 'solver_params',
+                         'pinned_threads', 'peak_memory', 'solve_case',
+                         'sweep'],
+    'spaceCache': ['SpaceCache', 'space_cache'],
+    'runCache': ['CACHE_EXCLUDE', 'SIMPLE_TYPES', 'func_source', 'canonical',
+                 'run_key', 'folder_size', 'RunCache', 'run_cache'],
+    'errorNorms': ['NORMS', 'DiskQuadrature', 'radial_derivative_matrix',
+                   'disk_quadrature', 'error_norms'],
+    'basicSolver': ['DedalusSolver'],
+    'conformal': ['square_to_circle', 'circle_to_square'],
+    'laplaceCoriolis': ['Lap_Cor'],
+    'specialFunctions': ['gaussian_q', 'gaussian', 'bessel_q', 'bessel'],
+    'snapshotBuffer': ['SnapshotBuffer'],
+    'snapshotReader': ['set_files', 'SnapshotReader', 'trig_interp',
+                       'SpectralReader', 'snapshot_reader'],
+    'snapshotLayout': ['COMPRESSIONS', 'set_file_layout'],
+    'runCatalog': ['SCHEMA', 'RUN_COLUMNS', 'param_value', 'RunCatalog',
+                   'run_catalog'],
+    'animator': ['CLIMS', 'frame_limits', 'PolarAnimator', 'render_frames',
+                 'render_mp4'],
+    'asyncOutput': ['AsyncOutput', 'async_file_handler'],
+    'checkpoint': ['SCHEDULE_ATTRS', 'checkpoint_path', 'list_checkpoints',
+                   'save_checkpoint', 'load_checkpoint'],
+    'diagnostics': ['REDUCTIONS', 'Diagnostics'],
+    'steadyState': ['SteadyStateMonitor'],
+    'performance': ['PERCENTILES', 'PerformanceMonitor'],
+    'timeSolver': ['time_PDE'],
+    'rotationPDE': ['rotation_PDE'],
+    'stommelMunk': ['stommel_PDE'],
+    'stommelSteady': ['stommel_steady'],
+    'ensemble': ['ensemble_members', 'resolution_key', 'run_member',
+                 'write_manifest', 'load_manifest', 'run_ensemble',
+                 'run_ensemble_mpi'],
+}
+_API = {name: module for module, names in _MODULES.items()
+        for name in names}
+
+
+def _load_all():
+    '''Import every module and return the names of the former
+    star import (all public globals of the modules, e.g. np, d3)'''
+    namespace = globals()
+    for module_name in _MODULES:
+        module = importlib.import_module(f'.{module_name}', __name__)
+        namespace.update({name: value for name, value in vars(module).items()
+                          if not name.startswith('_')})
+    namespace['dedalus'] = importlib.import_module('dedalus')
+    return sorted(name for name in namespace if not name.startswith('_')
+                  and name != 'importlib')
+
+
+def __getattr__(name):
+    if name in _API:
+        module = importlib.import_module(f'.{_API[name]}', __name__)
+        return getattr(module, name)
+    if name in _MODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    if name == '__all__':
+        globals()['__all__'] = _load_all()
+        return globals()['__all__']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_API) | set(_MODULES))
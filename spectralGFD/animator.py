@@ -0,0 +1,221 @@
+import os
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.animation
+from .plotting import polar_plot, image_plot, polar_regrid
+from .convergenceSweep import pinned_threads
+from .snapshotReader import snapshot_reader
+
+CLIMS = ('frame', 'running', 'fixed')
+
+
+def frame_limits(frames, indices, clim='fixed'):
+    '''Colour limits (len(indices), 2) of frames[k] for k in indices,
+    in one streamed pass: 'frame' = own min/max, 'running' = min/max
+    up to this frame, 'fixed' = min/max over all frames'''
+    limits = np.array([(np.nanmin(frames[k]), np.nanmax(frames[k]))
+                       for k in indices]).reshape(-1, 2)
+    if clim == 'running':
+        limits[:, 0] = np.minimum.accumulate(limits[:, 0])
+        limits[:, 1] = np.maximum.accumulate(limits[:, 1])
+    elif clim == 'fixed':
+        limits[:] = (limits[:, 0].min(), limits[:, 1].max())
+    return limits
+
+
+class PolarAnimator:
+    '''
+    Animation of polar frames reusing one figure: the QuadMesh and
+    colorbar are created on the first frame and then updated with
+    set_array/set_clim.
+
+    frames = indexable by frame number, frames[k] of shape (Nphi, Nr)
+             (SnapshotBuffer, snapshot_reader(...), array...); only
+             accessed frame by frame, so readers stream from disk
+    times = time of each frame (for titles)
+    clim = 'frame' (limits of each frame), 'running' (limits so far),
+           'fixed' (limits over all frames, one extra pass) or
+           (vmin, vmax)
+    image_size = n: draw n-by-n imshow images through the cached
+                 sparse polar_regrid (mapping 'disk' or 'square')
+                 instead of a pcolormesh
+    '''
+    def __init__(self, phi, r, frames, times, *, clim='frame', cmap=None,
+                 title='Time: {t:.3f}', figsize=(6, 5), dpi=100,
+                 image_size=None, mapping='disk'):
+        if not isinstance(clim, tuple) and clim not in CLIMS:
+            raise ValueError(f'Unknown clim {clim} (use one of {CLIMS} '
+                             f'or (vmin, vmax))')
+        # Export vars
+        self.phi = phi
+        self.r = r
+        self.frames = frames
+        self.times = times
+        self.clim = clim
+        self.cmap = cmap
+        self.title = title
+        self.dpi = dpi
+        self.image_size = image_size
+        self.mapping = mapping
+        self.im = None
+        self.running = None
+
+        fig, ax = plt.subplots(1, 3, width_ratios=[10, 1, 1],
+                               figsize=figsize)
+        ax[2].axis('off')
+        self.fig = fig
+        self.ax = ax
+
+    def limits(self, frame):
+        '''Colour limits of frame while streaming'''
+        if isinstance(self.clim, tuple):
+            return self.clim
+        limits = (np.nanmin(frame), np.nanmax(frame))
+        if self.clim == 'running':
+            if self.running is not None:
+                limits = (min(limits[0], self.running[0]),
+                          max(limits[1], self.running[1]))
+            self.running = limits
+        return limits
+
+    def draw(self, k, limits=None):
+        '''Draw frame k (limits default: from clim)'''
+        frame = np.asarray(self.frames[k])
+        title = self.title.format(t=self.times[k], k=k)
+        if self.im is None and self.image_size is not None:
+            self.im = image_plot(self.phi, self.r, frame.T, ax=self.ax[0],
+                                 title=title, cax=self.ax[1],
+                                 cmap=self.cmap, size=self.image_size,
+                                 mapping=self.mapping)
+        elif self.im is None:
+            self.im = polar_plot(self.phi, self.r, frame.T, ax=self.ax[0],
+                                 title=title, cax=self.ax[1],
+                                 cmap=self.cmap)
+        elif self.image_size is not None:
+            regrid = polar_regrid(self.phi, self.r, self.image_size,
+                                  mapping=self.mapping)
+            self.im.set_data(regrid(frame.T))
+            self.ax[0].title.set_text(title)
+        else:
+            self.im.set_array(frame.T)
+            self.ax[0].title.set_text(title)
+        if limits is None:
+            limits = self.limits(frame)
+        self.im.set_clim(*limits)
+        return (self.im,)
+
+    def animation(self, indices=None, interval=200):
+        '''matplotlib FuncAnimation over frame indices'''
+        if indices is None:
+            indices = range(len(self.times))
+        indices = list(indices)
+        draw = self.draw
+        if self.clim == 'fixed':
+            self.clim = tuple(frame_limits(self.frames, indices)[0])
+        elif self.clim == 'running':
+            self.running = None
+        return matplotlib.animation.FuncAnimation(self.fig, draw,
+                                                  frames=indices,
+                                                  interval=interval)
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def _render_chunk(source, phi, r, times, indices, limits, folder, options,
+                  backend=None):
+    '''PNG of each frame in indices (process pool worker: backend
+    'Agg')'''
+    if backend is not None:
+        plt.switch_backend(backend)
+    if isinstance(source, tuple):
+        frames = snapshot_reader(*source)  # (save_name, variable_name, ...)
+    else:
+        frames = source  # {k: frame}
+    animator = PolarAnimator(phi, r, frames, times, **options)
+    paths = []
+    for k, lim in zip(indices, limits):
+        path = os.path.join(folder, f'frame_{k:06d}.png')
+        animator.draw(k, lim)
+        animator.fig.savefig(path, dpi=animator.dpi)
+        paths.append(path)
+    animator.close()
+    return paths
+
+
+def render_frames(phi, r, frames, times, folder, indices=None, *,
+                  source=None, processes=1, clim='frame', **options):
+    '''Render frames (see PolarAnimator) to folder/frame_kkkkkk.png,
+    serially (processes=1) or on a spawn process pool of `processes`
+    workers (None = all cores). A pool re-imports the calling script
+    in each worker: the script needs an `if __name__ == '__main__'`
+    guard.
+    source = (save_name, variable_name[, sets]): workers stream frames from
+    disk; otherwise each worker is sent its share of frames.
+    'running' and 'fixed' limits come from one streamed pass first.
+    Returns list of PNG paths in frame order.'''
+    if indices is None:
+        indices = range(len(times))
+    indices = list(indices)
+    if isinstance(clim, tuple):
+        limits = [clim] * len(indices)
+    elif clim == 'frame':
+        limits = [None] * len(indices)
+    else:
+        limits = [tuple(lim) for lim in frame_limits(frames, indices, clim)]
+
+    os.makedirs(folder, exist_ok=True)
+    if processes is None:
+        processes = os.cpu_count()
+    processes = max(1, min(processes, len(indices)))
+    chunks = [[int(k) for k in chunk]
+              for chunk in np.array_split(indices, processes) if len(chunk)]
+    offsets = np.cumsum([0] + [len(chunk) for chunk in chunks])
+    limit_chunks = [limits[start:start + len(chunk)]
+                    for start, chunk in zip(offsets, chunks)]
+    options['clim'] = 'frame'  # Limits are passed per frame
+
+    def payload(chunk):
+        if source is not None:
+            return source
+        return {k: np.asarray(frames[k]) for k in chunk}
+
+    times = np.asarray(times)
+    if processes == 1:
+        return _render_chunk(frames, phi, r, times, indices, limits,
+                             folder, options)
+
+    with pinned_threads(1):
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=ctx) as pool:
+            futures = [pool.submit(_render_chunk, payload(chunk), phi, r,
+                                   times, chunk, chunk_limits, folder,
+                                   options, 'Agg')
+                       for chunk, chunk_limits in zip(chunks, limit_chunks)]
+            return [path for future in futures for path in future.result()]
+
+
+def render_mp4(filename, phi, r, frames, times, indices=None, *, fps=10,
+               processes=1, **kwargs):
+    '''Render frames to PNGs in parallel (see render_frames) and
+    encode them to filename (.mp4) with ffmpeg'''
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError('ffmpeg not found (needed for MP4 export)')
+    with tempfile.TemporaryDirectory() as folder:
+        paths = render_frames(phi, r, frames, times, folder, indices,
+                              processes=processes, **kwargs)
+        with open(os.path.join(folder, 'frames.txt'), 'w') as file:
+            for path in paths:
+                file.write(f"file '{path}'\nduration {1/fps}\n")
+        subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat',
+                        '-safe', '0', '-i', os.path.join(folder, 'frames.txt'),
+                        '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                        '-pix_fmt', 'yuv420p', filename], check=True)
+    return filename
@@ -0,0 +1,186 @@
+import queue
+import logging
+import threading
+import h5py
+import numpy as np
+from mpi4py import MPI
+from dedalus.core.field import Field
+from .parallel import use_comm
+from .spaceCache import space_cache
+logger = logging.getLogger(__name__)
+
+
+class AsyncOutput:
+    '''
+    Snapshot output overlapping with timestepping.
+
+    stage() gathers the coefficient data of `fields` to rank 0,
+    transforms it to grid space at `scales` on a serial copy of the
+    disk basis (so the solver's fields keep their layout), copies the
+    grids into one of `max_pending` preallocated staging slots and
+    returns. All Dedalus calls stay on the main thread; a writer
+    thread on rank 0 only passes the numpy grids to sink(grids, **meta).
+
+    Backpressure: stage() blocks only while all slots are waiting to
+    be written, so memory is bounded by max_pending frames of grids.
+    Errors of the writer are raised at the next stage(), flush() or
+    close().
+
+    fields = Dedalus fields on `disk` or its edge basis
+    Nphi, Nr, Lr, dealias = parameters of disk (see space_cache.get)
+    '''
+    def __init__(self, fields, disk, Nphi, Nr, Lr, dealias, scales, sink,
+                 max_pending=4):
+        # Export vars
+        self.fields = list(fields)
+        self.scales = scales
+        self.sink = sink
+        self.max_pending = max_pending
+        self.comm = self.fields[0].dist.comm
+        self.error = None
+        self.thread = None
+
+        if self.comm.rank != 0:
+            return
+
+        # Serial space for the transforms to grid space
+        with use_comm(MPI.COMM_SELF):
+            coords, dist, self_disk, phi, r = space_cache.get(
+                Nphi, Nr, Lr, dealias, fields[0].dtype)
+        self.scratch = []
+        for field in self.fields:
+            bases = []
+            for basis in field.domain.bases:
+                if basis is disk:
+                    bases.append(self_disk)
+                elif basis is disk.edge:
+                    bases.append(self_disk.edge)
+                else:
+                    raise NotImplementedError(f'AsyncOutput of {field} on '
+                                              f'{basis}')
+            self.scratch.append(dist.Field(name=field.name, bases=bases,
+                                           tensorsig=field.tensorsig,
+                                           dtype=field.dtype))
+
+        # Staging slots and queue of frames to write
+        self.free = queue.Queue()
+        for i in range(max_pending):
+            self.free.put(None)  # Allocated on first use
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop,
+                                       name='AsyncOutput', daemon=True)
+        self.thread.start()
+
+    def _raise(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError('AsyncOutput writer failed') from error
+
+    def stage(self, **meta):
+        '''Copy current grids of fields at scales and queue them for
+        writing with metadata meta (collective under MPI)'''
+        if self.comm.size == 1:
+            data = [field['c'] for field in self.fields]
+        else:
+            data = [field.gather_data(layout='c') for field in self.fields]
+        if self.comm.rank != 0:
+            return
+
+        self._raise()
+        slot = self.free.get()  # Blocks if writer is max_pending behind
+        grids = []
+        for scratch, coeffs in zip(self.scratch, data):
+            scratch.change_scales(1)
+            scratch['c'] = coeffs
+            scratch.change_scales(self.scales)
+            grids.append(scratch['g'])
+        if slot is None:
+            slot = [np.empty_like(grid) for grid in grids]
+        for grid, staged in zip(grids, slot):
+            np.copyto(staged, grid)
+        self.pending.put((slot, meta))
+
+    def _write_loop(self):
+        '''Writer thread: hand staged grids to sink (numpy only)'''
+        while True:
+            item = self.pending.get()
+            if item is None:
+                self.pending.task_done()
+                return
+            slot, meta = item
+            try:
+                if self.error is None:
+                    self.sink(slot, **meta)
+            except Exception as error:
+                logger.error('AsyncOutput writer failed: %r' % error)
+                self.error = error
+            finally:
+                self.free.put(slot)
+                self.pending.task_done()
+
+    def flush(self):
+        '''Wait until all staged frames are written'''
+        if self.thread is not None:
+            self.pending.join()
+            self._raise()
+
+    def close(self):
+        '''Write remaining frames and stop the writer thread'''
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+            self._raise()
+
+
+def async_file_handler(handler, disk, Nphi, Nr, Lr, dealias,
+                       max_pending=4):
+    '''Make Dedalus gather file handler write asynchronously.
+    Scheduling, set files and their layout stay those of handler;
+    only the HDF5 write moves to an AsyncOutput writer thread.
+    Returns the AsyncOutput (close() it after the run).'''
+    scales = [task['scales'] for task in handler.tasks]
+    if not all(isinstance(task['operator'], Field)
+               for task in handler.tasks):
+        raise NotImplementedError('Asynchronous output of state variables '
+                                  'only, not expressions')
+    if any(task['layout'] is not handler.dist.grid_layout
+           for task in handler.tasks) or len(set(scales)) > 1:
+        raise NotImplementedError('Asynchronous output needs grid tasks '
+                                  'at equal scales')
+    names = [task['name'] for task in handler.tasks]
+
+    def write(grids, path, file_write_num, **meta):
+        with h5py.File(path, 'r+') as file:
+            file.attrs['writes'] = file_write_num
+            for name, value in meta.items():
+                dset = file['scales'][name]
+                dset.resize(file_write_num, axis=0)
+                dset[file_write_num - 1] = value
+            for name, grid in zip(names, grids):
+                dset = file['tasks'][name]
+                dset.resize(file_write_num, axis=0)
+                dset[file_write_num - 1] = grid
+
+    fields = [task['operator'] for task in handler.tasks]
+    writer = AsyncOutput(fields, disk, Nphi, Nr, Lr, dealias,
+                         scales[0], write, max_pending=max_pending)
+
+    def process(iteration, wall_time=0, sim_time=0, timestep=0):
+        '''As H5FileHandlerBase.process, staging instead of writing'''
+        handler.total_write_num += 1
+        handler.file_write_num += 1
+        if handler.max_writes is not None:
+            if handler.file_write_num > handler.max_writes:
+                handler.set_num += 1
+                handler.file_write_num = 1
+        if not handler.current_file.exists():
+            handler.create_current_file()
+        writer.stage(path=str(handler.current_file),
+                     file_write_num=handler.file_write_num,
+                     sim_time=sim_time, wall_time=wall_time,
+                     timestep=timestep, iteration=iteration,
+                     write_number=handler.total_write_num)
+
+    handler.process = process
+    return writer
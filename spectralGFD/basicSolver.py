@@ -1,10 +1,12 @@
-from spectralGFD import *
 import numpy as np
 import dedalus.public as d3
 from functools import partial
 import time
-import matplotlib.pyplot as plt
-import copy
+from .parallel import bcast, default_mesh, is_root, root_only
+from .spaceCache import space_cache
+from .errorNorms import NORMS, error_norms
+from .polarGeometry import polar_geometry, func_on_mesh
+from .convergenceSweep import grid_cases, sweep
 
 class DedalusSolver:
     '''
@@ -18,7 +20,17 @@ class DedalusSolver:
           (__init__ executes run once)
     actual = set actual func
     compute_error = graph overview of error for saved run
+    compute_norms = L2, Linf, H1 errors by quadrature
     error_lists + error_plots = graph error for varying N
+    error_grid = error over Nphi x Nr grid (optionally on a process
+                 pool)
+
+    MPI: run scripts with `mpiexec -n N`. mesh = Dedalus process
+    mesh (default: default_mesh), stored as process_mesh (mesh() is
+    the polar grid). Gathers, plotting and file output happen on
+    rank 0 only.
+
+    matplotlib is only imported by the plotting methods.
 
     Other methods:
     plot
@@ -26,34 +38,36 @@ class DedalusSolver:
     plot_actual
     plot_gridpoints
     '''
-    def __init__(self, Nphi, Nr, Lr=1, *, dealias=1):
+    def __init__(self, Nphi, Nr, Lr=1, *, dealias=1, mesh=None):
         # Export vars
         self.Nphi = Nphi
         self.Nr = Nr
         self.Lr = Lr
         self.dealias = dealias
+        self.process_mesh = mesh
 
         # Run
         self.make_space()
 
     def make_space(self):
-        '''Setup Dedalus basis and field'''
+        '''Setup Dedalus basis and field. Coords, distributor, basis
+        and grids come from space_cache.'''
         # Import vars
         Nphi = self.Nphi
         Nr = self. Nr
         Lr = self.Lr
         dealias = self.dealias
+        mesh = self.process_mesh
 
         # Parameters
         dtype = np.float64
+        if mesh is None:
+            mesh = default_mesh(Nphi, Nr)
 
-        # Bases
-        coords = d3.PolarCoordinates('phi', 'r')
-        dist = d3.Distributor(coords, dtype=dtype)
-        disk = d3.DiskBasis(coords, shape=(Nphi, Nr), radius=Lr,
-                            dealias=dealias, dtype=dtype)  # Circular domain
+        # Bases (shared between solvers via space_cache)
+        coords, dist, disk, phi, r = space_cache.get(Nphi, Nr, Lr, dealias,
+                                                     dtype, mesh)
         edge = disk.edge
-        phi, r = dist.local_grids(disk)
 
         # Field
         u = dist.Field(name='u', bases=disk)
@@ -90,8 +104,10 @@ class DedalusSolver:
         scaled_func = partial(actual_func, Lr=Lr)
         return func_on_mesh(scaled_func, phi, r)
 
+    @root_only
     def plot(self, z, ax=None, filename=None, title=None, cax=None):
         '''Generic plot via polar_plot. Input z'''
+        from .plotting import polar_plot
         # Import vars
         phi = self.phi
         r = self.r
@@ -107,19 +123,20 @@ class DedalusSolver:
         z = self.actual(self.actual_func)
         self.plot(z, ax, filename, title, cax)
 
+    @root_only
     def plot_gridpoints(self, alpha=0.5):
         '''Plot polar gridpoints given radius and azimuth'''
+        import matplotlib.pyplot as plt
+        from .figureOutput import show
         # Import vars
         Nphi = self.Nphi
         Nr = self.Nr
         coords = self.coords
         dist = self.dist
         disk = self.disk
-        phi, r = dist.local_grids(disk)
-
-        phi_mesh, r_mesh = self.mesh()
-        x_vals = (r_mesh * np.cos(phi_mesh)).ravel()
-        y_vals = (r_mesh * np.sin(phi_mesh)).ravel()
+        x_vals, y_vals = self.to_cartesian()
+        x_vals = x_vals.ravel()
+        y_vals = y_vals.ravel()
 
         plt.figure(figsize=(5, 5))
         ax = plt.gca()
@@ -127,25 +144,23 @@ class DedalusSolver:
 
         plt.title(f'Grid points: Nphi={Nphi}, Nr={Nr}')
         plt.scatter(x_vals, y_vals, marker='x', s=10, alpha=alpha)
-        plt.show()
+        show()
+
+    def compute_norms(self, actual=None, norms=NORMS):
+        '''L2, Linf and H1 errors of ug against actual (array on
+        mesh, default from actual_func) by cached disk quadrature.
+        Returns dict of floats (same on all ranks).'''
+        norms_dict = None
+        if is_root():
+            if actual is None:
+                actual = self.actual(self.actual_func)
+            norms_dict = error_norms(self.ug, actual.T, self.Lr,
+                                     self.disk.alpha, norms)
+        return bcast(norms_dict)
 
     def integral_error(self):
         '''Compute sqrt(int(computed-actual)^2)'''
-        # Import vars
-        disk = self.disk
-        actual_func = self.actual_func
-        phi = self.phi
-        r = self.r
-        u = self.u  # field
-        dist = self.dist
-
-        # Actual field
-        actual = dist.Field(name='actual', bases=disk)
-        actual['g'] = actual_func(phi, r)
-
-        # Compute errors
-        error = np.sqrt(d3.integ((u - actual)**2)).evaluate()['g']
-        return error[0, 0]
+        return self.compute_norms(norms=['L2'])['L2']
 
     def naive_error(self):
         '''Sum of errors over grid'''
@@ -164,10 +179,13 @@ class DedalusSolver:
         ug = self.ug
         actual = self.actual(self.actual_func)
 
-        errors = actual - ug.T
-        weighted_norm = self.integral_error()
+        norms = self.compute_norms(actual)
+        weighted_norm = norms['L2']
 
-        if make_plots is True:
+        if make_plots is True and is_root():
+            import matplotlib.pyplot as plt
+            from .figureOutput import show
+            errors = actual - ug.T
             print('Error:', weighted_norm)
             # Plotting
             fig, axs = plt.subplots(1, 3, figsize=(20, 6))
@@ -179,67 +197,80 @@ class DedalusSolver:
             self.plot_actual(ax=axs[1], title='Actual')
             self.plot(errors, ax=axs[2], title='Error')
             plt.tight_layout()
-            plt.show()
 
             if filename is not None:
                 fig.savefig(filename+'.png', dpi=fig.dpi,
                             bbox_inches='tight')
+            show(fig, filename)
 
         # Export vars
         self.error = weighted_norm
+        self.errors = norms
 
-    def error_lists(self, Nphi_list, Nr_list):
+    def error_lists(self, Nphi_list, Nr_list, processes=1):
         '''Solve problem with various different Nphi and Nr
         (input as numpy lists, nb needs Nphi = 0 mod 4).
+        Varies Nr at fixed self.Nphi, then Nphi at fixed self.Nr.
+        processes = size of process pool (see sweep).
         Outputs lists of errors and times.'''
         # Import vars
         Nphi = self.Nphi
         Nr = self.Nr
-        loop_solver = copy.copy(self)
 
-        # Loop Nr
-        loop_solver.Nphi = Nphi
-        Nr_error_list = []
-        Nr_times_list = []
-
-        for Nr_loop in Nr_list:
-            print('Nr =', Nr_loop)
-
-            loop_solver.Nr = Nr_loop
-            loop_solver.run()
-            loop_solver.compute_error(make_plots=False)
-
-            Nr_error_list.append(loop_solver.error)
-            Nr_times_list.append(loop_solver.time)
-
-        # Loop Nphi
-        loop_solver.Nr = Nr
-        Nphi_error_list = []
-        Nphi_times_list = []
-
-        for Nphi_loop in Nphi_list:
-            print('Nphi =', Nphi_loop)
-
-            loop_solver.Nphi = Nphi_loop
-            loop_solver.run()
-            loop_solver.compute_error(make_plots=False)
-
-            Nphi_error_list.append(loop_solver.error)
-            Nphi_times_list.append(loop_solver.time)
-
-        print('Done!')
+        cases = [(Nphi, Nr_loop) for Nr_loop in Nr_list] \
+            + [(Nphi_loop, Nr) for Nphi_loop in Nphi_list]
+        self.error_table = sweep(self, cases, processes=processes)
+        self.error_lists_from_table(Nphi_list=Nphi_list, Nr_list=Nr_list)
+
+    def error_grid(self, Nphi_list, Nr_list, processes=1):
+        '''Solve problem over full Nphi x Nr grid (processes > 1: on a
+        spawn process pool, see sweep). Results in self.error_table
+        (pandas DataFrame); slices through self.Nphi, self.Nr feed
+        error_plots/error_plots_times.'''
+        cases = grid_cases(Nphi_list, Nr_list)
+        self.error_table = sweep(self, cases, processes=processes)
+        self.error_lists_from_table(
+            Nphi_list=Nphi_list if self.Nr in Nr_list else [],
+            Nr_list=Nr_list if self.Nphi in Nphi_list else [])
+
+    def error_lists_from_table(self, table=None, Nphi_list=None,
+                               Nr_list=None):
+        '''Set error and time lists from rows (self.Nphi, Nr) for Nr in
+        Nr_list, resp. (Nphi, self.Nr) for Nphi in Nphi_list, of table
+        (default self.error_table), in list order. Lists default to all
+        values in the table on these slices (sorted).'''
+        if table is None:
+            table = self.error_table
+        rows = {(int(row.Nphi), int(row.Nr)): row
+                for row in table.itertuples(index=False)}
+        if Nr_list is None:
+            Nr_list = sorted(Nr for Nphi, Nr in rows if Nphi == self.Nphi)
+        if Nphi_list is None:
+            Nphi_list = sorted(Nphi for Nphi, Nr in rows if Nr == self.Nr)
+
+        def select(cases):
+            missing = [case for case in cases if case not in rows]
+            if missing:
+                raise KeyError(f'No results for (Nphi, Nr) = {missing}')
+            return [rows[case] for case in cases]
+
+        Nr_rows = select([(self.Nphi, int(Nr)) for Nr in Nr_list])
+        Nphi_rows = select([(int(Nphi), self.Nr) for Nphi in Nphi_list])
 
         # Export vars
         self.Nr_list = Nr_list
+        self.Nr_error_list = [row.error for row in Nr_rows]
+        self.Nr_times_list = [row.time for row in Nr_rows]
         self.Nphi_list = Nphi_list
-        self.Nr_error_list = Nr_error_list
-        self.Nr_times_list = Nr_times_list
-        self.Nphi_error_list = Nphi_error_list
-        self.Nphi_times_list = Nphi_times_list
+        self.Nphi_error_list = [row.error for row in Nphi_rows]
+        self.Nphi_times_list = [row.time for row in Nphi_rows]
 
+    @root_only
     def error_plots(self, truncs=[20, 20]):
         '''Plots error and time lists from self.error_lists
            trunc = point to truncate best fit'''
+        import matplotlib.pyplot as plt
+        from .figureOutput import show
         # Import vars
         Nr_list = self.Nr_list
         Nphi_list = self.Nphi_list
@@ -282,10 +313,13 @@ class DedalusSolver:
             ax.legend()
 
         fig.tight_layout()
-        plt.show()
+        show(fig)
 
+    @root_only
     def error_plots_times(self):
         '''Plots error and time lists from self.error_lists'''
+        import matplotlib.pyplot as plt
+        from .figureOutput import show
         # Import vars
         Nr_list = self.Nr_list
         Nphi_list = self.Nphi_list
@@ -308,7 +342,7 @@ class DedalusSolver:
         plt.suptitle('Errors and Times vs varying radial basis size')
 
         fig.tight_layout()
-        plt.show()
+        show(fig)
 
         # Plot phi
         fig, axs = plt.subplots(1, 2, figsize=(12, 5))
@@ -324,11 +358,17 @@ class DedalusSolver:
         plt.suptitle('Errors and Times vs varying azimuthal basis size')
 
         fig.tight_layout()
-        plt.show()
+        show(fig)
+
+    @property
+    def geometry(self):
+        '''Cached PolarGeometry of grids phi, r (shared by all
+        solvers and plots on the same grid)'''
+        return polar_geometry(self.phi, self.r)
 
     def mesh(self):
         '''Mesh phi, r'''
-        phi_mesh, r_mesh = np.meshgrid(self.phi, self.r)
+        phi_mesh, r_mesh = self.geometry.mesh
 
         # Export vars
         self.phi_mesh = phi_mesh
@@ -337,13 +377,8 @@ class DedalusSolver:
 
     def to_cartesian(self):
         '''Polar to cartesian'''
-        phi_mesh, r_mesh = self.mesh()
-        x = r_mesh * np.cos(phi_mesh)
-        y = r_mesh * np.sin(phi_mesh)
-        return x, y
+        return self.geometry.cartesian
 
     def to_square(self):
         '''Map to square'''
-        u, v = self.to_cartesian()
-        x, y = circle_to_square(u, v)
-        return x, y
\ No newline at end of file
+        return self.geometry.square
\ No newline at end of file
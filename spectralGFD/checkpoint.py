@@ -0,0 +1,118 @@
+import os
+import re
+import glob
+import logging
+import h5py
+import numpy as np
+logger = logging.getLogger(__name__)
+
+SCHEDULE_ATTRS = ['last_wall_div', 'last_sim_div', 'last_iter_div']
+
+
+def checkpoint_path(folder, iteration, rank=0):
+    '''Checkpoint file of given iteration for one MPI rank'''
+    return os.path.join(folder, f'checkpoint_i{iteration:010d}_p{rank}.h5')
+
+
+def list_checkpoints(folder, rank=0):
+    '''Iterations with a checkpoint for rank, ascending'''
+    iterations = []
+    for path in glob.glob(os.path.join(folder, f'checkpoint_i*_p{rank}.h5')):
+        match = re.search(r'checkpoint_i(\d+)_p', os.path.basename(path))
+        iterations.append(int(match.group(1)))
+    return sorted(iterations)
+
+
+def save_checkpoint(solver, folder, handlers=(), keep=2):
+    '''Write full solver state to folder: every state variable
+    (tau fields included) in coefficient space, sim time/iteration,
+    the multistep history (MX, LX, F, dt) of SBDF/CNAB timesteppers,
+    and the output schedule of handlers. One file per rank; written
+    to a temporary file first so a kill never leaves a corrupt latest
+    checkpoint. Only the newest keep checkpoints are kept.'''
+    comm = solver.dist.comm
+    os.makedirs(folder, exist_ok=True)
+    path = checkpoint_path(folder, solver.iteration, comm.rank)
+    timestepper = solver.timestepper
+
+    with h5py.File(path + '.tmp', 'w') as file:
+        file.attrs['iteration'] = solver.iteration
+        file.attrs['sim_time'] = solver.sim_time
+        file.attrs['timestepper'] = type(timestepper).__name__
+        file.attrs['ranks'] = comm.size
+
+        state = file.create_group('state')
+        for i, field in enumerate(solver.state):
+            dset = state.create_dataset(str(i), data=field['c'])
+            dset.attrs['name'] = str(field.name)
+
+        # Multistep history (Runge-Kutta schemes have none)
+        history = file.create_group('history')
+        if hasattr(timestepper, 'MX'):
+            history.attrs['iteration'] = timestepper._iteration
+            history.create_dataset('dt', data=np.array(timestepper.dt))
+            for name in ['MX', 'LX', 'F']:
+                systems = getattr(timestepper, name)
+                data = np.array([system.data for system in systems])
+                history.create_dataset(name, data=data)
+        history.attrs['last_dt'] = getattr(solver, 'dt', np.nan)
+
+        schedule = file.create_group('schedule')
+        for k, handler in enumerate(handlers):
+            for attr in SCHEDULE_ATTRS:
+                schedule.attrs[f'{k}_{attr}'] = getattr(handler, attr)
+
+    os.replace(path + '.tmp', path)
+
+    # Remove old checkpoints
+    for iteration in list_checkpoints(folder, comm.rank)[:-keep]:
+        os.remove(checkpoint_path(folder, iteration, comm.rank))
+    return path
+
+
+def load_checkpoint(solver, folder, handlers=()):
+    '''Restore latest checkpoint in folder into solver (built from
+    the same problem, with the same number of ranks).
+    Returns timestep of the last step before the checkpoint.'''
+    comm = solver.dist.comm
+    iterations = list_checkpoints(folder, comm.rank) if comm.rank == 0 else None
+    iterations = comm.bcast(iterations, root=0)
+    if not iterations:
+        raise FileNotFoundError(f'No checkpoints in {folder}')
+    path = checkpoint_path(folder, iterations[-1], comm.rank)
+    logger.info('Resuming from %s' % path)
+    timestepper = solver.timestepper
+
+    with h5py.File(path, 'r') as file:
+        if file.attrs['ranks'] != comm.size:
+            raise ValueError('Checkpoint written with %i ranks, running on %i'
+                             % (file.attrs['ranks'], comm.size))
+        if file.attrs['timestepper'] != type(timestepper).__name__:
+            raise ValueError('Checkpoint timestepper %s does not match %s'
+                             % (file.attrs['timestepper'],
+                                type(timestepper).__name__))
+
+        for i, field in enumerate(solver.state):
+            field['c'] = file['state'][str(i)][:]
+
+        solver.iteration = solver.initial_iteration = int(file.attrs['iteration'])
+        solver.sim_time = solver.initial_sim_time = float(file.attrs['sim_time'])
+
+        history = file['history']
+        if hasattr(timestepper, 'MX'):
+            timestepper._iteration = int(history.attrs['iteration'])
+            timestepper.dt.clear()
+            timestepper.dt.extend(history['dt'][:])
+            for name in ['MX', 'LX', 'F']:
+                for system, data in zip(getattr(timestepper, name),
+                                        history[name][:]):
+                    system.data[:] = data
+            timestepper._LHS_params = None  # Rebuild LHS on next step
+        last_dt = float(history.attrs['last_dt'])
+
+        schedule = file['schedule']
+        for k, handler in enumerate(handlers):
+            for attr in SCHEDULE_ATTRS:
+                setattr(handler, attr, schedule.attrs[f'{k}_{attr}'])
+
+    return last_dt
@@ -0,0 +1,117 @@
+import os
+import copy
+import pickle
+import resource
+import multiprocessing
+from itertools import repeat
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+THREAD_VARS = ['OMP_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+               'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+
+
+def grid_cases(Nphi_list, Nr_list):
+    '''All (Nphi, Nr) pairs of Nphi_list x Nr_list'''
+    return [(int(Nphi), int(Nr)) for Nphi in Nphi_list for Nr in Nr_list]
+
+
+def solver_params(solver):
+    '''Picklable parameters of solver (Dedalus objects dropped;
+    make_space rebuilds them). Raises TypeError naming any other
+    unpicklable attribute.'''
+    params = {}
+    for key, value in solver.__dict__.items():
+        if type(value).__module__.startswith('dedalus'):
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception as error:
+            raise TypeError(f'Attribute {key}={value!r} of '
+                            f'{solver.__class__.__name__} cannot be sent '
+                            f'to worker processes ({error}); use '
+                            f'processes=1 or a module-level function'
+                            ) from error
+        params[key] = value
+    return params
+
+
+@contextmanager
+def pinned_threads(n_threads=1):
+    '''Set OMP/NUMEXPR/BLAS thread counts in os.environ so that
+    spawned workers inherit them. Restores previous values on exit.'''
+    old_env = {var: os.environ.get(var) for var in THREAD_VARS}
+    os.environ.update({var: str(n_threads) for var in THREAD_VARS})
+    try:
+        yield
+    finally:
+        for var, value in old_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def peak_memory():
+    '''Peak resident memory of this process in MB'''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def solve_case(solver, case):
+    '''Run solver at case = (Nphi, Nr) and return row of results.
+    solver needs actual_func set (see DedalusSolver.actual).'''
+    Nphi, Nr = case
+    solver.Nphi = Nphi
+    solver.Nr = Nr
+    solver.run()
+    solver.compute_error(make_plots=False)
+    return {'Nphi': Nphi, 'Nr': Nr, 'error': float(solver.error),
+            'Linf': float(solver.errors['Linf']),
+            'H1': float(solver.errors['H1']),
+            'time': solver.time, 'peak_mem': peak_memory()}
+
+
+def _solve_case_worker(solver_class, params, case):
+    '''Rebuild solver from params in worker process and solve case'''
+    solver = solver_class.__new__(solver_class)
+    solver.__dict__.update(params)
+    return solve_case(solver, case)
+
+
+def sweep(solver, cases, processes=1):
+    '''Solve copies of solver at each (Nphi, Nr) in cases and
+    return a DataFrame with columns Nphi, Nr, error (L2), Linf, H1,
+    time, peak_mem.
+
+    processes = number of worker processes (None = all cores).
+                Workers are spawned with OMP/NUMEXPR threads pinned
+                to 1 and re-import the calling script, which needs an
+                `if __name__ == '__main__'` guard. processes=1
+                (default) runs in this process.
+    time = wall time of solve_problem, peak_mem = peak RSS (MB) of
+    the process which solved the case (high-water mark per worker).'''
+    import pandas as pd
+    cases = [(int(Nphi), int(Nr)) for Nphi, Nr in cases]
+    if processes is None:
+        processes = os.cpu_count()
+    processes = min(processes, len(cases))
+
+    if processes <= 1:
+        loop_solver = copy.copy(solver)
+        rows = []
+        for case in cases:
+            print('Nphi = %i, Nr = %i' % case)
+            rows.append(solve_case(loop_solver, case))
+    else:
+        solver_class = solver.__class__
+        params = solver_params(solver)
+        with pinned_threads(1):
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=processes,
+                                     mp_context=ctx) as pool:
+                rows = list(pool.map(_solve_case_worker, repeat(solver_class),
+                                     repeat(params), cases))
+
+    print('Done!')
+    return pd.DataFrame(rows, columns=['Nphi', 'Nr', 'error', 'Linf', 'H1',
+                                       'time', 'peak_mem'])
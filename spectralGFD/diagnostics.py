@@ -0,0 +1,90 @@
+import os
+import dedalus.public as d3
+from .parallel import is_root
+
+REDUCTIONS = ('integ', 'max', 'min', 'max_abs')
+
+
+class Diagnostics:
+    '''
+    Scalar diagnostics evaluated inside the time loop every
+    `cadence` iterations, independent of snapshot output.
+
+    diagnostics = dict of name -> (expression, reduction), where
+                  expression is a string in the problem namespace
+                  (or a Dedalus operator) and reduction is one of
+                  'integ' (area integral), 'max', 'min', 'max_abs'
+    filename = csv file appended to (and flushed) every evaluation,
+               so it can be read while the run is going (rank 0);
+               overwritten unless resume=True (then appended to)
+
+    Call update(solver, dt) after each solver.step.
+    '''
+    def __init__(self, solver, diagnostics, cadence, filename=None,
+                 resume=False):
+        for name, (expression, reduction) in diagnostics.items():
+            if reduction not in REDUCTIONS:
+                raise ValueError(f'Unknown reduction {reduction} for {name}'
+                                 f' (use one of {REDUCTIONS})')
+
+        flow = d3.GlobalFlowProperty(solver, cadence=cadence)
+        for name, (expression, reduction) in diagnostics.items():
+            flow.add_property(expression, name=name,
+                              precompute_integral=(reduction == 'integ'))
+
+        self.columns = ['sim_time', 'iteration'] + list(diagnostics)
+        self.file = None
+        if filename is not None and is_root():
+            new_file = resume is False or not os.path.exists(filename)
+            self.file = open(filename, 'w' if new_file else 'a')
+            if new_file:
+                self.file.write(','.join(self.columns) + '\n')
+                self.file.flush()
+
+        # Export vars
+        self.diagnostics = diagnostics
+        self.cadence = cadence
+        self.filename = filename
+        self.flow = flow
+        self.rows = []
+
+    def reduce(self, name, reduction):
+        '''Global value of diagnostic name (same on all ranks)'''
+        flow = self.flow
+        if reduction == 'integ':
+            return flow.volume_integral(name)
+        if reduction == 'max':
+            return flow.max(name)
+        if reduction == 'min':
+            return flow.min(name)
+        if reduction == 'max_abs':
+            return max(flow.max(name), -flow.min(name))
+
+    def update(self, solver, dt):
+        '''Record diagnostics if they were evaluated in the last step
+        (handlers are evaluated on the state before stepping)'''
+        iteration = solver.iteration - 1
+        if iteration % self.cadence != 0:
+            return
+
+        row = [solver.sim_time - dt, iteration]
+        for name, (expression, reduction) in self.diagnostics.items():
+            row.append(self.reduce(name, reduction))
+        self.rows.append(row)
+
+        if self.file is not None:
+            values = [repr(float(row[0])), str(row[1])] \
+                + [repr(float(x)) for x in row[2:]]
+            self.file.write(','.join(values) + '\n')
+            self.file.flush()
+
+    def close(self):
+        '''Close csv file'''
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def table(self):
+        '''Diagnostics recorded in this run as a DataFrame'''
+        import pandas as pd
+        return pd.DataFrame(self.rows, columns=self.columns)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from mpi4py import MPI
+from . import parallel
+from .convergenceSweep import pinned_threads
+
+
+def ensemble_members(param_list, initial_funcs=None, **kwargs):
+    '''Constructor arguments for every (params, initial_func) pair.
+    kwargs = arguments shared by all members (Nphi, Nr, constants...);
+    entries of param_list override them. initial_funcs=None uses
+    kwargs['initial_func'] for every member.'''
+    if initial_funcs is None:
+        initial_funcs = [kwargs.pop('initial_func')]
+    members = []
+    for params in param_list:
+        for initial_func in initial_funcs:
+            member = dict(kwargs)
+            member.update(params)
+            member['initial_func'] = initial_func
+            members.append(member)
+    return members
+
+
+def resolution_key(member):
+    '''Members with equal keys share bases via space_cache'''
+    return (member['Nphi'], member['Nr'], member.get('Lr', 1),
+            str(member.get('dealias', 2)))
+
+
+def run_member(solver_class, index, member):
+    '''Run one ensemble member writing to saves/member['save_name'].
+    Returns its manifest entry (failures are recorded, not raised).'''
+    time_0 = time.perf_counter()
+    try:
+        solver_class(local=False, **member)
+        status = 'done'
+    except Exception as error:
+        status = f'failed: {error!r}'
+    return {'index': index, 'save_name': member['save_name'],
+            'status': status, 'wall_time': time.perf_counter() - time_0,
+            'params': {key: value for key, value in member.items()
+                       if key not in ['initial_func', 'save_name']},
+            'initial_func': getattr(member['initial_func'], '__name__',
+                                    repr(member['initial_func']))}
+
+
+def _name_members(members, name):
+    '''Give every member its own save_name'''
+    for i, member in enumerate(members):
+        member['save_name'] = f'{name} member {i:03d}'
+    return members
+
+
+def write_manifest(name, solver_class, entries):
+    '''Write saves/name/manifest.json'''
+    os.makedirs(f'saves/{name}', exist_ok=True)
+    manifest = {'name': name, 'class': solver_class.__name__,
+                'created': time.strftime("%Y-%m-%d %H:%M:%S",
+                                         time.localtime()),
+                'members': sorted(entries, key=lambda entry: entry['index'])}
+    with open(f'saves/{name}/manifest.json', 'w') as file:
+        json.dump(manifest, file, default=str, indent=1)
+    return manifest
+
+
+def load_manifest(name):
+    '''Manifest of ensemble name'''
+    with open(f'saves/{name}/manifest.json') as file:
+        return json.load(file)
+
+
+def run_ensemble(solver_class, param_list, initial_funcs=None, *, name=None,
+                 processes=1, **kwargs):
+    '''Run a time_PDE subclass for every (params, initial_func) pair,
+    in this process (processes=1, default) or on a spawn process pool
+    of at most `processes` workers (None = all cores), OMP/NUMEXPR
+    threads pinned to 1. Workers re-import the calling script, which
+    then needs an `if __name__ == '__main__'` guard (otherwise the
+    pool fails with a RuntimeError). Each member writes to its own
+    saves/ folder; the manifest goes to saves/name/manifest.json.
+    Members are ordered by resolution so runs sharing a resolution
+    follow each other and reuse the workers' cached bases.
+    Functions in initial_funcs must be picklable (module level).'''
+    if name is None:
+        name = 'Ensemble ' + time.strftime("%Y-%m-%d %H:%M:%S",
+                                           time.localtime())
+    members = _name_members(ensemble_members(param_list, initial_funcs,
+                                             **kwargs), name)
+    order = sorted(range(len(members)),
+                   key=lambda i: resolution_key(members[i]))
+    if processes is None:
+        processes = os.cpu_count()
+    processes = max(1, min(processes, len(members)))
+
+    if processes == 1:
+        entries = [run_member(solver_class, i, members[i]) for i in order]
+    else:
+        with pinned_threads(1):
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=processes,
+                                     mp_context=ctx) as pool:
+                try:
+                    entries = list(pool.map(run_member,
+                                            repeat(solver_class), order,
+                                            [members[i] for i in order]))
+                except BrokenProcessPool as error:
+                    raise RuntimeError('Ensemble worker died; scripts using '
+                                       'processes > 1 need an `if __name__ '
+                                       "== '__main__'` guard") from error
+
+    return write_manifest(name, solver_class, entries)
+
+
+def run_ensemble_mpi(solver_class, param_list, initial_funcs=None, *,
+                     name=None, group_size=1, **kwargs):
+    '''As run_ensemble, but under `mpiexec -n N`: COMM_WORLD is split
+    into N // group_size sub-communicators, each running its share of
+    members (round robin over resolution-ordered members) with solvers
+    distributed over the group. Call on all ranks.'''
+    world = MPI.COMM_WORLD
+    if world.size % group_size != 0:
+        raise ValueError(f'{world.size} ranks not divisible into groups '
+                         f'of {group_size}')
+    n_groups = world.size // group_size
+    color = world.rank // group_size
+
+    if name is None:
+        name = 'Ensemble ' + time.strftime("%Y-%m-%d %H:%M:%S",
+                                           time.localtime())
+    name = world.bcast(name, root=0)
+    members = _name_members(ensemble_members(param_list, initial_funcs,
+                                             **kwargs), name)
+    order = sorted(range(len(members)),
+                   key=lambda i: resolution_key(members[i]))
+
+    group_comm = world.Split(color, world.rank)
+    entries = []
+    with parallel.use_comm(group_comm):
+        for i in order[color::n_groups]:
+            entries.append(run_member(solver_class, i, members[i]))
+
+    # Collect entries from group roots
+    if group_comm.rank != 0:
+        entries = []
+    all_entries = world.gather(entries, root=0)
+    group_comm.Free()
+
+    manifest = None
+    if world.rank == 0:
+        entries = [entry for group in all_entries for entry in group]
+        manifest = write_manifest(name, solver_class, entries)
+    return world.bcast(manifest, root=0)
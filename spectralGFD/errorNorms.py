@@ -0,0 +1,99 @@
+import numpy as np
+from functools import lru_cache
+from dedalus.libraries import dedalus_sphere
+
+NORMS = ('L2', 'Linf', 'H1')
+
+
+class DiskQuadrature:
+    '''
+    Quadrature on the Dedalus disk grid of shape (Nphi, Nr) with
+    radius Lr (uniform in phi, Gauss-Zernike in r).
+
+    weights = w such that sum(w * f) = int f dA (shape (1, Nr))
+    r = radial grid (shape (1, Nr))
+    D_pos, D_neg = radial differentiation matrices (Nr x Nr) acting
+                   on f(r, phi) and f(r, phi + pi) respectively
+    k = azimuthal wavenumbers for rfft along phi
+
+    Radial derivatives use Lagrange interpolation across the diameter
+    (nodes -r, r): interpolating on r alone is ill-conditioned as the
+    nodes only cluster at r = Lr. Needs Nphi even.
+
+    Construct via disk_quadrature (cached).
+    '''
+    def __init__(self, Nphi, Nr, Lr=1, alpha=0):
+        # Radial Gauss nodes/weights as in DiskBasis._native_radius_grid
+        z, w_r = dedalus_sphere.zernike.quadrature(2, Nr, k=alpha)
+        r = np.sqrt((z + 1) / 2).astype(np.float64)
+        w_r = w_r / (1 - r**2)**alpha  # Remove Zernike weight (1-r^2)^alpha
+
+        k = np.arange(Nphi // 2 + 1, dtype=np.float64)
+        if Nphi % 2 == 0:
+            k[-1] = 0  # Drop Nyquist mode from derivative
+
+        # Export vars
+        self.Nphi = Nphi
+        self.Nr = Nr
+        self.Lr = Lr
+        self.r = Lr * r[np.newaxis, :]
+        self.weights = (2 * np.pi / Nphi) * Lr**2 * w_r[np.newaxis, :]
+        D = radial_derivative_matrix(np.concatenate([-r[::-1], r])) / Lr
+        self.D_pos = D[Nr:, Nr:]
+        self.D_neg = D[Nr:, Nr-1::-1]  # Columns ordered as r
+        self.k = k[:, np.newaxis]
+
+    def integrate(self, f):
+        '''int f dA for f of shape (..., Nphi, Nr)'''
+        return np.sum(self.weights * f, axis=(-2, -1))
+
+    def grad(self, f):
+        '''Polar gradient components (df/dr, 1/r df/dphi) of f
+        with shape (..., Nphi, Nr). Spectral in phi and r.'''
+        f_pi = np.roll(f, -(self.Nphi // 2), axis=-2)  # f(r, phi + pi)
+        f_r = f @ self.D_pos.T + f_pi @ self.D_neg.T
+        f_hat = np.fft.rfft(f, axis=-2)
+        f_phi = np.fft.irfft(1j * self.k * f_hat, n=self.Nphi, axis=-2)
+        return f_r, f_phi / self.r
+
+
+def radial_derivative_matrix(r):
+    '''Lagrange interpolation derivative matrix on nodes r
+    (barycentric form, weights in log space for large N)'''
+    diff = r[:, np.newaxis] - r[np.newaxis, :]
+    np.fill_diagonal(diff, 1)
+    log_w = -np.sum(np.log(np.abs(diff)), axis=1)
+    sign_w = np.prod(np.sign(diff), axis=1)
+    ratio = sign_w[np.newaxis, :] * sign_w[:, np.newaxis] \
+        * np.exp(log_w[np.newaxis, :] - log_w[:, np.newaxis])  # w_j / w_i
+    D = ratio / diff
+    np.fill_diagonal(D, 0)
+    np.fill_diagonal(D, -np.sum(D, axis=1))
+    return D
+
+
+@lru_cache(maxsize=16)
+def disk_quadrature(Nphi, Nr, Lr=1, alpha=0):
+    '''Cached DiskQuadrature for grid shape (Nphi, Nr)'''
+    return DiskQuadrature(Nphi, Nr, Lr, alpha)
+
+
+def error_norms(data, actual, Lr=1, alpha=0, norms=NORMS):
+    '''L2, Linf and H1 norms of data - actual on the disk grid.
+    data = gathered grid data of shape (..., Nphi, Nr), e.g. a
+           single field or a time series of snapshots (n_t, Nphi, Nr)
+    actual = array broadcastable to data
+    Returns dict of norm name -> float (or array over leading axes)'''
+    quad = disk_quadrature(*np.shape(data)[-2:], Lr, alpha)
+    errors = np.asarray(data) - actual
+
+    result = {}
+    L2_sq = quad.integrate(errors**2)
+    if 'L2' in norms:
+        result['L2'] = np.sqrt(L2_sq)
+    if 'Linf' in norms:
+        result['Linf'] = np.max(np.abs(errors), axis=(-2, -1))
+    if 'H1' in norms:
+        e_r, e_phi = quad.grad(errors)
+        result['H1'] = np.sqrt(L2_sq + quad.integrate(e_r**2 + e_phi**2))
+    return result
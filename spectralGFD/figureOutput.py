@@ -0,0 +1,102 @@
+import os
+from contextlib import contextmanager
+
+
+class FigureOutput:
+    '''
+    Where figures go: shown interactively (plt.show, IPython display)
+    or, in headless mode, written to files under `folder` with the Agg
+    backend and closed, so memory stays flat over many figures and
+    IPython is never imported. matplotlib and IPython are imported
+    on first use only.
+
+    Headless mode is selected at runtime with set_headless(), the
+    headless(folder) context manager, or the environment variable
+    SPECTRALGFD_HEADLESS=1 (folder SPECTRALGFD_FIGURES, default
+    'figures').
+    '''
+    def __init__(self):
+        self.headless = False
+        self.folder = os.environ.get('SPECTRALGFD_FIGURES', 'figures')
+        self.count = 0
+        self.backend = None
+        if os.environ.get('SPECTRALGFD_HEADLESS', '0') not in ('', '0'):
+            # Agg from the start, without importing matplotlib here
+            os.environ['MPLBACKEND'] = 'Agg'
+            self.headless = True
+
+    def set(self, headless=True, folder=None):
+        '''Switch headless mode on/off (on: Agg backend, off: restore
+        the previous backend)'''
+        if folder is not None:
+            self.folder = folder
+        if headless and not self.headless:
+            import matplotlib
+            import matplotlib.pyplot as plt
+            self.backend = matplotlib.get_backend()
+            plt.switch_backend('Agg')
+        elif not headless and self.headless and self.backend is not None:
+            import matplotlib.pyplot as plt
+            plt.switch_backend(self.backend)
+        self.headless = headless
+
+    def path(self, name):
+        '''Path of output name in folder (folder created)'''
+        os.makedirs(self.folder, exist_ok=True)
+        return os.path.join(self.folder, name)
+
+    def show(self, fig=None, filename=None):
+        '''plt.show(), or in headless mode save fig (unless already
+        saved to filename) as folder/figure_kkkk.png and close it'''
+        import matplotlib.pyplot as plt
+        if not self.headless:
+            plt.show()
+            return
+        if fig is None:
+            fig = plt.gcf()
+        if filename is None:
+            self.count += 1
+            fig.savefig(self.path(f'figure_{self.count:04d}.png'),
+                        dpi=fig.dpi, bbox_inches='tight')
+        plt.close(fig)
+
+    def clear_output(self, wait=False):
+        '''IPython clear_output (nothing in headless mode)'''
+        if not self.headless:
+            from IPython.display import clear_output
+            clear_output(wait=wait)
+
+    def display_animation(self, ani):
+        '''Display FuncAnimation in notebook'''
+        from IPython.display import HTML, display
+        display(HTML(ani.to_jshtml()))
+
+
+figure_output = FigureOutput()
+
+
+def set_headless(headless=True, folder=None):
+    figure_output.set(headless, folder)
+
+
+def is_headless():
+    return figure_output.headless
+
+
+@contextmanager
+def headless(folder=None):
+    '''Headless mode (figures written to folder) inside the block'''
+    previous = (figure_output.headless, figure_output.folder)
+    figure_output.set(True, folder)
+    try:
+        yield figure_output
+    finally:
+        figure_output.set(*previous)
+
+
+def show(fig=None, filename=None):
+    figure_output.show(fig, filename)
+
+
+def clear_output(wait=False):
+    figure_output.clear_output(wait)
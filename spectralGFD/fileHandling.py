@@ -1,73 +1,93 @@
-import h5py
 import matplotlib.pyplot as plt
-import matplotlib.animation
 import numpy as np
-from IPython.display import HTML, display
-from spectralGFD import *
+import pandas as pd
+from .plotting import polar_plot
+from .snapshotReader import snapshot_reader
+from .animator import PolarAnimator, render_frames
+from .figureOutput import figure_output, is_headless, show
 
-def animate_file(save_name, file_num=1, variable_name='q', frames=None, cmap=None):
-    '''Animate from folder called save_name'''
-    with h5py.File(f"saves/{save_name}/{save_name}_s{file_num}.h5",
-                   mode='r') as file:
-        # Load dataset
-        q = file['tasks'][variable_name]
-        t_list = q.dims[0][0]
-        phi_list = q.dims[1][0]
-        r_list = q.dims[2][0]
+def file_sets(file_num):
+    '''Set numbers to read: None = all sets'''
+    return None if file_num is None else [file_num]
 
-        if frames is None:
-            frames = range(len(t_list))
 
-        def plot_func(k):
-            polar_plot(phi_list, r_list, q[k].T, ax=ax[0],
-                       title=f'Time: {t_list[k]:.3f}', cax=ax[1], cmap=cmap)
+def animate_file(save_name, file_num=None, variable_name='q', frames=None,
+                 cmap=None, clim='frame'):
+    '''Animate from folder called save_name (all set files,
+    or only set file_num), streaming frames from disk (headless: PNG
+    frames, see figureOutput). clim = colour limits, see PolarAnimator'''
+    reader = snapshot_reader(save_name, variable_name, file_sets(file_num))
+    if is_headless():  # PNG frames in figure folder
+        return render_frames(reader.phi, reader.r, reader, reader.times,
+                             figure_output.path(save_name), frames,
+                             source=(save_name, variable_name,
+                                     file_sets(file_num)),
+                             clim=clim, cmap=cmap)
+    animator = PolarAnimator(reader.phi, reader.r, reader, reader.times,
+                             clim=clim, cmap=cmap)
+    ani2 = animator.animation(frames)
+    plt.show()
+    return ani2
 
-        fig, ax = plt.subplots(1, 3, width_ratios=[10, 1, 1], figsize=(6, 5))
-        ax[2].axis('off')
-        ani2 = matplotlib.animation.FuncAnimation(fig, plot_func,
-                                                  frames=frames)
-        plt.show()
 
 
-
-def time_plot_file(save_name, file_num=1, plot_t_list=[0, .5, 1],
+def time_plot_file(save_name, file_num=None, plot_t_list=[0, .5, 1],
                    variable_name='q', filename=None):
-    '''From folder save_name,
+    '''From folder save_name (all set files, or only set file_num),
     Plots PDE over time. `plot_t_list` is list
     of normalised time in [0,1] to be plotted.'''
-    with h5py.File(f"saves/{save_name}/{save_name}_s{file_num}.h5",
-                   mode='r') as file:
-        # Load dataset
-        q = file['tasks'][variable_name]
-        t_list = q.dims[0][0]
-        phi_list = q.dims[1][0]
-        r_list = q.dims[2][0]
-
-        # Plotting
-        plot_length = len(plot_t_list)
-        fig, axs = plt.subplots(1, plot_length, figsize=(20, 6))
-
-        for i, t in enumerate(plot_t_list):
-            t_ind = int(t * (len(t_list) - 1))
-            polar_plot(phi_list, r_list, q[t_ind].T, ax=axs[i],
-                       title=f'Time = {t_list[t_ind]:.3}')
-        fig.tight_layout()
-        plt.show()
-
-        if filename is not None:
-            fig.savefig(filename+'.png', dpi=fig.dpi,
-                        bbox_inches='tight')
-
-
-def load_snapshot(save_name, file_num=1, index=0,
+    reader = snapshot_reader(save_name, variable_name, file_sets(file_num))
+    t_list = reader.times
+
+    # Plotting
+    plot_length = len(plot_t_list)
+    fig, axs = plt.subplots(1, plot_length, figsize=(20, 6))
+
+    for i, t in enumerate(plot_t_list):
+        t_ind = int(t * (len(t_list) - 1))
+        polar_plot(reader.phi, reader.r, reader[t_ind].T, ax=axs[i],
+                   title=f'Time = {t_list[t_ind]:.3}')
+    fig.tight_layout()
+
+    if filename is not None:
+        fig.savefig(filename+'.png', dpi=fig.dpi,
+                    bbox_inches='tight')
+    show(fig, filename)
+
+
+def load_diagnostics(save_name):
+    '''Diagnostics time series of folder save_name as DataFrame
+    (safe to call while the run is still writing)'''
+    return pd.read_csv(f'saves/{save_name}/diagnostics.csv')
+
+
+def plot_diagnostics_table(table, names=None, filename=None):
+    '''Plot diagnostics columns (default all) of table against sim_time'''
+    if names is None:
+        names = [name for name in table.columns
+                 if name not in ['sim_time', 'iteration']]
+
+    fig, axs = plt.subplots(1, len(names), figsize=(5*len(names), 4),
+                            squeeze=False)
+    for ax, name in zip(axs[0], names):
+        ax.plot(table['sim_time'], table[name])
+        ax.set(xlabel='Time', title=name)
+    fig.tight_layout()
+
+    if filename is not None:
+        fig.savefig(filename+'.png', dpi=fig.dpi, bbox_inches='tight')
+    show(fig, filename)
+
+
+def plot_diagnostics_file(save_name, names=None, filename=None):
+    '''Plot diagnostics of folder save_name'''
+    plot_diagnostics_table(load_diagnostics(save_name), names=names,
+                           filename=filename)
+
+
+def load_snapshot(save_name, file_num=None, index=0,
                   variable_name='q'):
-    '''From folder save_name.'''
-    with h5py.File(f"saves/{save_name}/{save_name}_s{file_num}.h5",
-                   mode='r') as file:
-        # Load dataset
-        q = file['tasks'][variable_name]
-        t_list = q.dims[0][0]
-        phi_list = q.dims[1][0]
-        r_list = q.dims[2][0]
-
-        return phi_list[:], r_list[:], q[index], t_list[index]
\ No newline at end of file
+    '''From folder save_name. index counts over all set files
+    (or within set file_num).'''
+    reader = snapshot_reader(save_name, variable_name, file_sets(file_num))
+    return reader.phi, reader.r, np.array(reader[index]), reader.times[index]
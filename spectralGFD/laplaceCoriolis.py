@@ -1,5 +1,11 @@
-from spectralGFD import *
-from IPython.display import clear_output
+import os
+import json
+import numpy as np
+import dedalus.public as d3
+from .parallel import bcast, is_root, global_grids
+from .runCache import run_key, run_cache
+from .figureOutput import clear_output
+from .basicSolver import DedalusSolver
 
 class Lap_Cor(DedalusSolver):
     '''
@@ -15,11 +21,18 @@ class Lap_Cor(DedalusSolver):
     Nphi, Nr = Grid spacing
     q_func(phi, r, Ld) = q
 
-    'ug' outputs np.array. 'u' outputs dedalus object
+    'ug' outputs np.array (on rank 0 only). 'u' outputs dedalus object
 
     Returns phi, r, u
+
+    solve_batch = solve for many q_func, reusing the factorised solver
+
+    cache = True stores phi, r, ug in saves/Lap_Cor <key>/result.npz
+    (key = run_key, incl. source of q_func) and loads them instead of
+    solving when an identical problem was solved before.
     '''
-    def __init__(self, Nphi, Nr, q_func, *, Ld=np.inf, Lr=1, dealias=1):
+    def __init__(self, Nphi, Nr, q_func, *, Ld=np.inf, Lr=1, dealias=1,
+                 mesh=None, cache=False):
         # Export vars
         self.Nphi = Nphi
         self.Nr = Nr
@@ -27,9 +40,38 @@ class Lap_Cor(DedalusSolver):
         self.Ld = Ld
         self.Lr = Lr
         self.dealias = dealias
+        self.process_mesh = mesh
+        self.cache = cache
 
         # Run
-        self.run()
+        if cache is False:
+            self.run()
+        else:
+            self.cached_run()
+
+    def cached_run(self):
+        '''run, or load result of identical problem from run_cache'''
+        key = run_key(self)
+        folder = f'{self.__class__.__name__} {key}'
+        entry = bcast(run_cache.lookup(key) if is_root() else None)
+        if entry is None:
+            self.run()
+            if is_root():
+                os.makedirs(f'saves/{folder}', exist_ok=True)
+                np.savez(f'saves/{folder}/result.npz', phi=self.phi,
+                         r=self.r, ug=self.ug, time=self.time)
+                with open(f'saves/{folder}/params.json', 'w') as file:
+                    json.dump(self.__dict__, file, default=str)
+                run_cache.add(key, folder, self.__class__.__name__)
+        else:
+            self.make_space()
+            # Global grids, as saved by solve_problem
+            self.phi, self.r = global_grids(self.dist, self.disk)
+            self.ug = None
+            if is_root():
+                with np.load(f'saves/{entry["folder"]}/result.npz') as data:
+                    self.ug = data['ug']
+                    self.time = float(data['time'])
 
     def make_problem(self):
         '''Make problem with Laplace equation'''
@@ -61,6 +103,7 @@ class Lap_Cor(DedalusSolver):
         problem.add_equation("u(r=Lr) = 0")
 
         # Export vars
+        self.q = q
         self.problem = problem
 
     def solve_problem(self, local=None, save_every=None, save_name=None):
@@ -75,15 +118,51 @@ class Lap_Cor(DedalusSolver):
         solver = problem.build_solver()
         solver.solve()
 
-        # Gather global data
-        phi, r = dist.local_grids(disk)
-        ug = u.allgather_data('g')
-        print('Done!')
-
-        clear_output(wait=True)
+        # Gather global data (rank 0)
+        phi, r = global_grids(dist, disk)
+        ug = u.gather_data(layout='g')
+        if is_root():
+            print('Done!')
+            clear_output(wait=True)
 
         # Export vars
+        self.solver = solver
+        self.solver_key = self.operator_key()
         self.u = u
         self.ug = ug
         self.phi = phi
-        self.r = r
\ No newline at end of file
+        self.r = r
+
+    def operator_key(self):
+        '''Parameters which determine the LBVP matrices'''
+        return (self.Nphi, self.Nr, self.Lr, self.Ld, self.dealias)
+
+    def solve_batch(self, q_funcs):
+        '''Generator solving lap(u) - u/Ld^2 = q for each q_func in
+        iterable q_funcs. The solver (and its factorisation) is only
+        rebuilt if Nphi, Nr, Lr, Ld or dealias have changed; otherwise
+        only the forcing field q is swapped. Yields ug per forcing
+        (None on ranks other than 0).'''
+        # Rebuild if operator changed since last solve
+        if getattr(self, 'solver_key', None) != self.operator_key():
+            self.run()
+
+        # Import vars
+        Ld = self.Ld
+        Lr = self.Lr
+        dist = self.dist
+        disk = self.disk
+        solver = self.solver
+        q = self.q
+        u = self.u
+        phi, r = dist.local_grids(disk)
+
+        for q_func in q_funcs:
+            q.change_scales(1)  # Match phi, r
+            q['g'] = q_func(phi, r, Ld, Lr=Lr)
+            solver.solve()
+
+            # Export vars
+            self.q_func = q_func
+            self.ug = u.gather_data(layout='g')
+            yield self.ug
\ No newline at end of file
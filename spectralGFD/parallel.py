@@ -0,0 +1,70 @@
+import logging
+from functools import wraps
+from contextlib import contextmanager
+from mpi4py import MPI
+logger = logging.getLogger(__name__)
+
+# Run in parallel with:
+# $mpiexec -n N python script.py
+comm = MPI.COMM_WORLD
+
+
+def get_comm():
+    '''Communicator solvers are built on (see use_comm)'''
+    return comm
+
+
+@contextmanager
+def use_comm(new_comm):
+    '''Build solvers on new_comm (e.g. a sub-communicator of an
+    ensemble) inside this context'''
+    global comm
+    old_comm = comm
+    comm = new_comm
+    try:
+        yield new_comm
+    finally:
+        comm = old_comm
+
+
+def is_root():
+    '''True on rank 0 (and in serial)'''
+    return comm.rank == 0
+
+
+def root_only(func):
+    '''Decorator: only call func on rank 0 (returns None elsewhere).
+    Use for plotting and file output, not for collective operations.'''
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if is_root():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def bcast(obj):
+    '''Broadcast obj from rank 0 to all ranks'''
+    if comm.size == 1:
+        return obj
+    return comm.bcast(obj, root=0)
+
+
+def default_mesh(Nphi, Nr):
+    '''Process mesh for the disk basis. Polar domains only allow a
+    1-D mesh, i.e. all ranks along one axis. Warns if the azimuthal
+    modes do not split evenly (load imbalance).'''
+    size = comm.size
+    if size == 1:
+        return None
+    if size > Nphi // 2:
+        raise ValueError(f'Too many ranks ({size}) for Nphi={Nphi}')
+    if (Nphi // 2) % size != 0 or Nr % size != 0:
+        logger.warning('Nphi=%i, Nr=%i do not divide evenly over %i ranks'
+                       % (Nphi, Nr, size))
+    return (size,)
+
+
+def global_grids(dist, disk, scales=1):
+    '''Global (phi, r) grids on all ranks; equal to
+    dist.local_grids in serial'''
+    return disk.global_grids(dist, dist.remedy_scales(scales))
@@ -0,0 +1,136 @@
+import time
+import logging
+import datetime
+from contextlib import contextmanager
+import numpy as np
+from mpi4py import MPI
+from dedalus.core.evaluator import SystemHandler
+from .convergenceSweep import peak_memory
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+class PerformanceMonitor:
+    '''
+    Wall-time instrumentation of a time_PDE run.
+
+    Per step wall times are recorded with step(). The process() of
+    the file handlers in `handlers` (writes, inside solver.step) is
+    timed as 'output', that of other dictionary/file handlers (CFL,
+    diagnostics) as 'handlers'. System handlers (the RHS group F)
+    are not wrapped, so RHS evaluation counts as solver time, as
+    does evaluating output tasks (shared with the RHS transforms).
+    timed('gather') covers change_scales and copies of local
+    snapshots. solver time = step time - output and handler time
+    spent inside steps.
+
+    report(dt) logs it/s, sim time / wall time and an ETA to
+    stop_sim_time; summary() gives step time percentiles, totals and
+    peak RSS (max over ranks) for params.json.
+    '''
+    def __init__(self, solver, handlers=()):
+        # Export vars
+        self.solver = solver
+        self.comm = solver.dist.comm
+        self.file_handlers = list(handlers)
+        self.step_times = []
+        self.totals = {'output': 0, 'handlers': 0, 'gather': 0}
+        self.in_step = 0  # Handler time of current step
+        self.step_handlers = 0  # Handler time inside all steps
+        self.start_iteration = solver.iteration
+        self.start_sim_time = solver.sim_time
+        self.start_wall = time.perf_counter()
+
+        for handler in solver.evaluator.handlers:
+            if isinstance(handler, SystemHandler):
+                continue
+            category = 'handlers'
+            if handler in self.file_handlers:
+                category = 'output'
+            handler.process = self._timed_process(handler.process, category)
+
+    def _timed_process(self, process, category):
+        def timed_process(*args, **kwargs):
+            time_0 = time.perf_counter()
+            try:
+                return process(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - time_0
+                self.totals[category] += elapsed
+                self.in_step += elapsed
+        return timed_process
+
+    @contextmanager
+    def timed(self, category):
+        '''Add wall time of block to totals[category]'''
+        time_0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[category] += time.perf_counter() - time_0
+
+    def step(self, dt):
+        '''solver.step(dt), recording its wall time'''
+        self.in_step = 0
+        time_0 = time.perf_counter()
+        self.solver.step(dt)
+        self.step_times.append(time.perf_counter() - time_0)
+        self.step_handlers += self.in_step
+        self.in_step = 0
+
+    @property
+    def wall_time(self):
+        return time.perf_counter() - self.start_wall
+
+    def rates(self):
+        '''(iterations per second, sim time per wall time)'''
+        wall = self.wall_time
+        if wall <= 0:
+            return 0, 0
+        iterations = self.solver.iteration - self.start_iteration
+        sim = self.solver.sim_time - self.start_sim_time
+        return iterations / wall, sim / wall
+
+    def eta(self):
+        '''Estimated wall seconds until stop_sim_time'''
+        it_rate, sim_rate = self.rates()
+        if sim_rate <= 0:
+            return np.inf
+        return max(self.solver.stop_sim_time - self.solver.sim_time, 0) \
+            / sim_rate
+
+    def report(self, dt):
+        '''Log progress line with throughput and ETA'''
+        solver = self.solver
+        it_rate, sim_rate = self.rates()
+        eta = self.eta()
+        if np.isfinite(eta):
+            eta = str(datetime.timedelta(seconds=round(eta)))
+        logger.info('Iteration=%i, Time=%e, dt=%e, %.3g it/s, '
+                    'sim/wall=%.3g, ETA=%s'
+                    % (solver.iteration, solver.sim_time, dt,
+                       it_rate, sim_rate, eta))
+
+    def summary(self):
+        '''Compact performance summary (JSON serialisable)'''
+        step_times = np.array(self.step_times)
+        it_rate, sim_rate = self.rates()
+        summary = {'iterations': len(step_times),
+                   'wall_time': self.wall_time,
+                   'it_per_s': it_rate,
+                   'sim_per_wall': sim_rate,
+                   'step_time': float(step_times.sum())}
+        if len(step_times) > 0:
+            summary['step_time_mean'] = float(step_times.mean())
+            for p, value in zip(PERCENTILES,
+                                np.percentile(step_times, PERCENTILES)):
+                summary[f'step_time_p{p}'] = float(value)
+            summary['step_time_max'] = float(step_times.max())
+        summary['solver_time'] = summary['step_time'] - self.step_handlers
+        summary.update({f'{name}_time': value
+                        for name, value in self.totals.items()})
+        summary['peak_rss_MB'] = self.comm.allreduce(peak_memory(),
+                                                     op=MPI.MAX)
+        summary['ranks'] = self.comm.size
+        return summary
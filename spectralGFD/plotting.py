@@ -2,7 +2,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import warnings
-from IPython.display import clear_output
+from collections import OrderedDict
+import scipy.sparse
+from .figureOutput import show, clear_output, is_headless
+from .conformal import square_to_circle
+from .polarGeometry import PolarGeometry, polar_geometry, func_on_mesh
+
+STYLE = {'font.size': 16}
+matplotlib.rcParams.update(STYLE)  # Only once plotting is used
 
 def test():
     print('Hello world')
@@ -46,7 +53,7 @@ def im_plot(x_vals, y_vals, z, *, ax=None, filename=None, title=None, cax=None,
     if ax_set is False:
         if filename is not None:
             fig.savefig(filename+'.png', dpi=fig.dpi, bbox_inches='tight')
-        plt.show()
+        show(fig, filename)
     return im
 
 
@@ -60,25 +67,163 @@ def polar_plot(phi, r, z, *, ax=None, filename=None, title=None, cax=None, cmap=
             cax = colourbar axis (False=disable)
             cmap = custom colour map'''
 
-    phi_mesh, r_mesh = np.meshgrid(phi, r)
-    x_vals = r_mesh * np.cos(phi_mesh)
-    y_vals = r_mesh * np.sin(phi_mesh)
+    x_vals, y_vals = polar_geometry(phi, r).cartesian
 
     im = im_plot(x_vals, y_vals, z, ax=ax,
                  filename=filename, title=title, cax=cax, cmap=cmap)
     return im
 
 
+MAPPINGS = ('disk', 'square')
+
+
+class PolarRegrid:
+    '''
+    Sparse linear operator from values on polar grid (phi, r) to a
+    size-by-size image, for imshow instead of a pcolormesh of
+    Nphi x Nr quads. Get via polar_regrid (cached per grid and size).
+
+    mapping = 'disk': Cartesian pixels on [-Lr, Lr]^2 (NaN outside
+              the disk), 'square': pixels of the square mapped onto
+              the disk by square_to_circle
+    Lr = disk radius (default: last point of r)
+
+    Bilinear in (phi, r), periodic in phi; between the centre and
+    the first radius it blends linearly to the mean of the first ring.
+    regrid(z) = image of z (shape Nr-by-Nphi, as for polar_plot),
+    one sparse mat-vec per frame.
+    '''
+    def __init__(self, phi, r, size=256, Lr=None, mapping='disk'):
+        if mapping not in MAPPINGS:
+            raise ValueError(f'Unknown mapping {mapping} '
+                             f'(use one of {MAPPINGS})')
+        phi = np.ravel(phi)
+        r = np.ravel(r)
+        if Lr is None:
+            Lr = r[-1]
+        Nphi = len(phi)
+        Nr = len(r)
+
+        # Pixel centres (rows = y, for origin='lower')
+        pixels = (np.arange(size) + 0.5) / size * 2 - 1
+        x, y = np.meshgrid(pixels, pixels)
+        if mapping == 'square':
+            x, y = square_to_circle(x, y)
+        x, y = Lr * x.ravel(), Lr * y.ravel()
+        R = np.hypot(x, y)
+        inside = R <= Lr * (1 + 1e-12)
+
+        # Periodic neighbours in phi (uniform grid)
+        s = np.mod(np.arctan2(y, x) - phi[0], 2*np.pi) / (2*np.pi) * Nphi
+        j0 = np.floor(s).astype(int) % Nphi
+        j1 = (j0 + 1) % Nphi
+        fp = s - np.floor(s)
+
+        # Neighbours in r (clamped to [r[0], r[-1]])
+        Rc = np.clip(R, r[0], r[-1])
+        i1 = np.clip(np.searchsorted(r, Rc), 1, max(Nr - 1, 1))
+        i0 = i1 - 1
+        fr = (Rc - r[i0]) / (r[i1] - r[i0])
+        # Blend to centre value inside first ring
+        t = np.where(R < r[0], R / r[0], 1)
+
+        pix = np.flatnonzero(inside)
+        rows = [np.tile(pix, 4)]
+        cols = [np.concatenate([i0[pix]*Nphi + j0[pix],
+                                i0[pix]*Nphi + j1[pix],
+                                i1[pix]*Nphi + j0[pix],
+                                i1[pix]*Nphi + j1[pix]])]
+        fr, fp, t = fr[pix], fp[pix], t[pix]
+        vals = [np.concatenate([t*(1 - fr)*(1 - fp), t*(1 - fr)*fp,
+                                t*fr*(1 - fp), t*fr*fp])]
+        centre = pix[t < 1]
+        if len(centre):
+            rows.append(np.repeat(centre, Nphi))
+            cols.append(np.tile(np.arange(Nphi), len(centre)))
+            vals.append(np.repeat((1 - t[t < 1]) / Nphi, Nphi))
+        matrix = scipy.sparse.coo_matrix(
+            (np.concatenate(vals), (np.concatenate(rows),
+                                    np.concatenate(cols))),
+            shape=(size * size, Nr * Nphi))
+
+        # Export vars
+        self.size = size
+        self.Lr = Lr
+        self.mapping = mapping
+        self.matrix = matrix.tocsr()
+        self.outside = ~inside
+        self.extent = (-Lr, Lr, -Lr, Lr)
+
+    def __call__(self, z):
+        image = self.matrix @ np.ravel(z)
+        image[self.outside] = np.nan
+        return image.reshape(self.size, self.size)
+
+
+_regrids = OrderedDict()
+
+
+def polar_regrid(phi, r, size=256, Lr=None, mapping='disk', maxsize=8):
+    '''Cached PolarRegrid for grid (phi, r) and image size (LRU)'''
+    phi = np.ravel(phi)
+    r = np.ravel(r)
+    key = (phi.tobytes(), r.tobytes(), size, Lr, mapping)
+    if key in _regrids:
+        _regrids.move_to_end(key)
+        return _regrids[key]
+
+    regrid = PolarRegrid(phi, r, size, Lr, mapping)
+    _regrids[key] = regrid
+    while len(_regrids) > maxsize:
+        _regrids.popitem(last=False)
+    return regrid
+
+
+def image_plot(phi, r, z, *, ax=None, filename=None, title=None, cax=None,
+               cmap=None, size=256, Lr=None, mapping='disk'):
+    ''' As polar_plot, but z(phi,r) is regridded to a size-by-size
+    image (see PolarRegrid) and drawn with imshow: faster to draw and
+    small in vector formats.
+    Inputs as polar_plot, plus
+            size = image size in pixels
+            Lr = disk radius (default: last point of r)
+            mapping = 'disk' or 'square' (square_to_circle)'''
+    regrid = polar_regrid(phi, r, size, Lr, mapping)
+
+    if ax is None:
+        ax_set = False
+        fig = plt.figure(figsize=(5, 5))
+        ax = fig.gca()
+    else:
+        ax_set = True
+
+    if title is not None:
+        ax.title.set_text(title)
+    else:
+        ax.title.set_text(filename)
+
+    im = ax.imshow(regrid(z), origin='lower', extent=regrid.extent,
+                   cmap=cmap, interpolation='nearest')
+
+    if cax is None:
+        plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    elif cax is False:
+        pass
+    else:
+        plt.colorbar(im, cax=cax)
+
+    if ax_set is False:
+        if filename is not None:
+            fig.savefig(filename+'.png', dpi=fig.dpi, bbox_inches='tight')
+        show(fig, filename)
+    return im
+
+
 def animate(plot_func, t_list, pause=0):
     '''Make animation based on a plot function and time list'''
     for k, t in enumerate(t_list):
         clear_output(wait=True)
         plot_func(k, t)
-        plt.pause(pause)
-        plt.show()
-
-
-def func_on_mesh(psi, phi, r):
-    '''Return psi(phi, r) on meshed grid'''
-    phi_mesh, r_mesh = np.meshgrid(phi, r)
-    return psi(phi_mesh, r_mesh)
\ No newline at end of file
+        if not is_headless():
+            plt.pause(pause)
+        show()
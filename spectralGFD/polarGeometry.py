@@ -0,0 +1,68 @@
+import numpy as np
+from collections import OrderedDict
+from functools import cached_property
+from .conformal import circle_to_square
+
+
+class PolarGeometry:
+    '''
+    Meshes and coordinate transforms of polar grid (phi, r),
+    each computed on first use and then reused.
+    Get via polar_geometry (cached per grid).
+
+    mesh = (phi_mesh, r_mesh), shape Nr-by-Nphi
+    cartesian = (x, y) on mesh
+    square = (x, y) mapped to square via circle_to_square
+    '''
+    def __init__(self, phi, r):
+        self.phi = np.ravel(phi)
+        self.r = np.ravel(r)
+
+    @staticmethod
+    def _freeze(arrays):
+        '''Cached arrays are shared: make read-only'''
+        for array in arrays:
+            array.setflags(write=False)
+        return arrays
+
+    @cached_property
+    def mesh(self):
+        return self._freeze(tuple(np.meshgrid(self.phi, self.r)))
+
+    @cached_property
+    def cartesian(self):
+        phi_mesh, r_mesh = self.mesh
+        x = r_mesh * np.cos(phi_mesh)
+        y = r_mesh * np.sin(phi_mesh)
+        return self._freeze((x, y))
+
+    @cached_property
+    def square(self):
+        u, v = self.cartesian
+        return self._freeze(circle_to_square(u, v))
+
+
+_geometries = OrderedDict()
+
+
+def polar_geometry(phi, r, maxsize=8):
+    '''Cached PolarGeometry for grid (phi, r). Keyed by the grid
+    values, so a new resolution gives a new geometry (LRU eviction).'''
+    phi = np.ravel(phi)
+    r = np.ravel(r)
+    key = (phi.tobytes(), r.tobytes())
+    if key in _geometries:
+        _geometries.move_to_end(key)
+        return _geometries[key]
+
+    geometry = PolarGeometry(phi, r)
+    _geometries[key] = geometry
+    while len(_geometries) > maxsize:
+        _geometries.popitem(last=False)
+    return geometry
+
+
+def func_on_mesh(psi, phi, r):
+    '''Return psi(phi, r) on meshed grid'''
+    phi_mesh, r_mesh = polar_geometry(phi, r).mesh
+    return psi(phi_mesh, r_mesh)
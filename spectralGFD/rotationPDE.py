@@ -1,4 +1,6 @@
-from spectralGFD import *
+import dedalus.public as d3
+from .errorNorms import NORMS
+from .timeSolver import time_PDE
 
 class rotation_PDE(time_PDE):
     def make_problem(self):
@@ -34,7 +36,22 @@ class rotation_PDE(time_PDE):
         # Export vars
         self.q = psi
         self.t = t
+        self.velocity = u
         self.problem = problem
         self.variable_name = 'psi'
 
+    def default_diagnostics(self):
+        '''Integral, variance and max |psi| (conserved by rotation)'''
+        return {'integral': ('psi', 'integ'),
+                'variance': ('psi**2', 'integ'),
+                'max_psi': ('psi', 'max_abs')}
+
+    def exact(self, phi, r, t):
+        '''Exact solution: initial_func rotated by t'''
+        return self.initial_func(phi - t, r)
+
+    def rotation_errors(self, norms=NORMS):
+        '''Error norms of each local snapshot against exact'''
+        return self.snapshot_errors(self.exact, norms=norms)
+
 
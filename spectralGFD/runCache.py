@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import inspect
+import hashlib
+import functools
+import numpy as np
+
+# Attributes which do not change the result of a run
+CACHE_EXCLUDE = {'local', 'save_name', 'import_previous', 'variable_name',
+                 'process_mesh', 'resume', 'checkpoint_every',
+                 'keep_checkpoints', 'snapshot_dtype', 'keep_last',
+                 'cache', 'async_output', 'max_pending'}
+
+SIMPLE_TYPES = (bool, int, float, complex, str, bytes, type(None))
+
+
+def func_source(func):
+    '''Source code of func (bytecode if the source is unavailable)'''
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, '__code__', None)
+        if code is None:
+            return repr(func)
+        return code.co_code.hex() + repr(code.co_consts)
+
+
+def canonical(value, seen=None):
+    '''Stable, hashable description of value. Functions are described
+    by their source, defaults, closure and the globals they reference
+    (recursively), so changing e.g. a module level `n` used by an
+    initial condition changes the description.'''
+    if seen is None:
+        seen = set()
+    if isinstance(value, SIMPLE_TYPES):
+        return repr(value)
+    if isinstance(value, (np.generic,)):
+        return repr(value.item())
+    if isinstance(value, np.ndarray):
+        return 'array(%s, %s, %s)' % (value.dtype, value.shape,
+                                      hashlib.sha256(value.tobytes())
+                                      .hexdigest())
+    if isinstance(value, (list, tuple)):
+        return '[%s]' % ', '.join(canonical(x, seen) for x in value)
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join(f'{key!r}: {canonical(value[key], seen)}'
+                                  for key in sorted(value, key=repr))
+    if isinstance(value, functools.partial):
+        return 'partial(%s, %s, %s)' % (canonical(value.func, seen),
+                                        canonical(value.args, seen),
+                                        canonical(value.keywords, seen))
+    if isinstance(value, type):
+        return f'{value.__module__}.{value.__qualname__}'
+    if isinstance(value, types.FunctionType):
+        name = f'{value.__module__}.{value.__qualname__}'
+        if id(value) in seen:
+            return name
+        seen.add(id(value))
+        parts = [name, func_source(value),
+                 canonical(value.__defaults__, seen),
+                 canonical(value.__kwdefaults__, seen)]
+        if value.__closure__ is not None:
+            parts.append(canonical([cell.cell_contents
+                                    for cell in value.__closure__], seen))
+        for global_name in value.__code__.co_names:
+            if global_name not in value.__globals__:
+                continue
+            global_value = value.__globals__[global_name]
+            if isinstance(global_value, types.ModuleType):
+                continue
+            parts.append(f'{global_name}={canonical(global_value, seen)}')
+        return '\n'.join(parts)
+    if callable(value):
+        return getattr(value, '__qualname__', repr(value))
+    description = repr(value)
+    if ' at 0x' in description:  # Default repr is not stable
+        return type(value).__qualname__
+    return description
+
+
+def run_key(solver, exclude=CACHE_EXCLUDE):
+    '''Hash of class (name and source) and parameters (solver.__dict__
+    before running) which determine the result of a run'''
+    params = {key: value for key, value in solver.__dict__.items()
+              if key not in exclude}
+    description = canonical([type(solver), func_source(type(solver)),
+                             params])
+    return hashlib.sha256(description.encode()).hexdigest()[:20]
+
+
+def folder_size(folder):
+    '''Total size of files in folder (bytes)'''
+    size = 0
+    for path, dirs, files in os.walk(folder):
+        for file in files:
+            size += os.path.getsize(os.path.join(path, file))
+    return size
+
+
+class RunCache:
+    '''
+    Content-addressed cache of finished runs under `root` (saves/).
+
+    index = root/run_cache.json maps run_key -> entry
+            {'folder', 'class', 'created', 'last_used', 'size'}.
+    An entry is valid while root/folder/marker exists (params.json is
+    written at the end of a run, so unfinished runs are never hit).
+    If max_bytes is set, after each add() the least recently used
+    entries are deleted until the total size is below max_bytes
+    (default None: nothing is deleted automatically). Deleted runs
+    are also removed from the run catalog.
+
+    Runs that were not cached (e.g. with an explicit save_name) are
+    never touched. Use from rank 0 only.
+
+    Invalidate with run_cache.invalidate(key) (or no key for all), or
+    $python -m spectralGFD.runCache invalidate [key ...]
+    '''
+    def __init__(self, root='saves', max_bytes=None,
+                 marker='params.json'):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.marker = marker
+
+    @property
+    def index_path(self):
+        return os.path.join(self.root, 'run_cache.json')
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as file:
+            return json.load(file)
+
+    def save_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(index, file, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def folder_path(self, entry):
+        return os.path.join(self.root, entry['folder'])
+
+    def lookup(self, key):
+        '''Entry of finished run with key (None on a miss)'''
+        index = self.load_index()
+        entry = index.get(key)
+        if entry is None:
+            return None
+        if not os.path.exists(os.path.join(self.folder_path(entry),
+                                           self.marker)):
+            del index[key]  # Deleted or unfinished
+            self.save_index(index)
+            return None
+        entry['last_used'] = time.time()
+        self.save_index(index)
+        return entry
+
+    def add(self, key, folder, class_name):
+        '''Register finished run in root/folder and evict'''
+        index = self.load_index()
+        now = time.time()
+        index[key] = {'folder': folder, 'class': class_name,
+                      'created': now, 'last_used': now,
+                      'size': folder_size(os.path.join(self.root, folder))}
+        self.save_index(index)
+        if self.max_bytes is not None:
+            self.evict(keep=key)
+
+    def size(self):
+        '''Total size of cached runs (bytes)'''
+        return sum(entry['size'] for entry in self.load_index().values())
+
+    def delete(self, entry):
+        '''Delete folder of entry and its run catalog row'''
+        from .runCatalog import RunCatalog
+        shutil.rmtree(self.folder_path(entry), ignore_errors=True)
+        catalog = RunCatalog(self.root)
+        if os.path.exists(catalog.path):
+            catalog.remove(entry['folder'])
+
+    def evict(self, max_bytes=None, keep=None):
+        '''Delete least recently used runs until the cache is below
+        max_bytes (default self.max_bytes). Returns evicted keys.'''
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        if max_bytes is None:
+            return []
+        index = self.load_index()
+        total = sum(entry['size'] for entry in index.values())
+        evicted = []
+        for key in sorted(index, key=lambda key: index[key]['last_used']):
+            if total <= max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key]['size']
+            self.delete(index[key])
+            del index[key]
+            evicted.append(key)
+        self.save_index(index)
+        return evicted
+
+    def invalidate(self, keys=None):
+        '''Delete cached runs with keys (all if None)'''
+        index = self.load_index()
+        if keys is None:
+            keys = list(index)
+        elif isinstance(keys, str):
+            keys = [keys]
+        for key in keys:
+            entry = index.pop(key, None)
+            if entry is not None:
+                self.delete(entry)
+        self.save_index(index)
+
+    def info(self):
+        '''Entries of the cache'''
+        return self.load_index()
+
+
+run_cache = RunCache()
+
+
+if __name__ == '__main__':
+    # $python -m spectralGFD.runCache [info | size | evict GiB |
+    #                                   invalidate [key ...]]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'info'
+    if command == 'invalidate':
+        run_cache.invalidate(sys.argv[2:] or None)
+    elif command == 'evict':
+        print(run_cache.evict(float(sys.argv[2]) * 2**30))
+    elif command == 'size':
+        print(run_cache.size())
+    else:
+        for key, entry in run_cache.info().items():
+            print(key, entry['class'], entry['folder'], entry['size'])
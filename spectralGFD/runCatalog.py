@@ -0,0 +1,192 @@
+import os
+import re
+import json
+import sqlite3
+from .runCache import folder_size
+from .snapshotReader import set_files
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    save_name TEXT PRIMARY KEY,
+    class TEXT,
+    Nphi INTEGER,
+    Nr INTEGER,
+    timestepper TEXT,
+    timestep REAL,
+    stop_sim_time REAL,
+    execution_time TEXT,
+    execution_end_time TEXT,
+    wall_time REAL,
+    size_bytes INTEGER,
+    n_sets INTEGER,
+    sets TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    save_name TEXT,
+    name TEXT,
+    value_real REAL,
+    value_text TEXT
+);
+CREATE INDEX IF NOT EXISTS params_real ON params (name, value_real);
+CREATE INDEX IF NOT EXISTS params_text ON params (name, value_text);
+CREATE INDEX IF NOT EXISTS runs_class ON runs (class, Nphi, Nr);
+'''
+
+RUN_COLUMNS = ['save_name', 'class', 'Nphi', 'Nr', 'timestepper',
+               'timestep', 'stop_sim_time', 'execution_time',
+               'execution_end_time', 'wall_time', 'size_bytes', 'n_sets',
+               'sets', 'params']
+
+
+def param_value(value):
+    '''Stored form of a params.json value: classes like
+    "<class 'dedalus.core.timesteppers.SBDF3'>" become "SBDF3"'''
+    if isinstance(value, str):
+        match = re.fullmatch(r"<class '(?:[\w.]+\.)?(\w+)'>", value)
+        if match:
+            return match.group(1)
+    return value
+
+
+class RunCatalog:
+    '''
+    SQLite index of finished file runs in saves/ (saves/catalog.sqlite).
+
+    One row per run (class, resolution, timestepper, timing, size on
+    disk, set files) plus every scalar parameter of params.json in an
+    indexed table, so queries do not open any run folder.
+    time_PDE adds runs when solve_problem finishes; scan() indexes
+    existing folders.
+
+    Example:
+    run_catalog.query('stommel_PDE', Nphi=256, Nr=256, nu=80)
+    run_catalog.load(save_name) = solver with import_previous=True
+    '''
+    def __init__(self, root='saves', filename='catalog.sqlite'):
+        self.root = root
+        self.path = os.path.join(root, filename)
+
+    def connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def add(self, save_name):
+        '''Index run saves/save_name (needs params.json)'''
+        folder = os.path.join(self.root, save_name)
+        with open(os.path.join(folder, 'params.json')) as file:
+            params = {key: param_value(value)
+                      for key, value in json.load(file).items()}
+        sets = [os.path.basename(path)
+                for path in set_files(save_name, self.root).values()]
+        perf = params.get('perf') or {}
+        row = {'save_name': save_name,
+               'class': params.get('class_name', save_name.split()[-1]),
+               'Nphi': params.get('Nphi'),
+               'Nr': params.get('Nr'),
+               'timestepper': params.get('timestepper'),
+               'timestep': params.get('timestep'),
+               'stop_sim_time': params.get('stop_sim_time'),
+               'execution_time': params.get('execution_time'),
+               'execution_end_time': params.get('execution_end_time'),
+               'wall_time': perf.get('wall_time'),
+               'size_bytes': folder_size(folder),
+               'n_sets': len(sets),
+               'sets': json.dumps(sets),
+               'params': json.dumps(params)}
+
+        param_rows = []
+        for name, value in params.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float,
+                                                                 str)):
+                value = json.dumps(value)
+            if isinstance(value, str):
+                param_rows.append((save_name, name, None, value))
+            else:
+                param_rows.append((save_name, name, float(value), None))
+
+        with self.connect() as connection:
+            connection.execute('DELETE FROM params WHERE save_name = ?',
+                               (save_name,))
+            connection.execute('INSERT OR REPLACE INTO runs VALUES (%s)'
+                               % ', '.join('?' * len(RUN_COLUMNS)),
+                               [row[column] for column in RUN_COLUMNS])
+            connection.executemany('INSERT INTO params VALUES (?, ?, ?, ?)',
+                                   param_rows)
+        connection.close()
+
+    def scan(self):
+        '''Index every folder of root with a params.json'''
+        added = []
+        for save_name in sorted(os.listdir(self.root)):
+            if os.path.exists(os.path.join(self.root, save_name,
+                                           'params.json')):
+                self.add(save_name)
+                added.append(save_name)
+        return added
+
+    def remove(self, save_name):
+        with self.connect() as connection:
+            connection.execute('DELETE FROM runs WHERE save_name = ?',
+                               (save_name,))
+            connection.execute('DELETE FROM params WHERE save_name = ?',
+                               (save_name,))
+        connection.close()
+
+    def prune(self):
+        '''Remove runs whose folder was deleted'''
+        removed = [save_name for save_name in self.query()['save_name']
+                   if not os.path.exists(os.path.join(self.root, save_name))]
+        for save_name in removed:
+            self.remove(save_name)
+        return removed
+
+    def query(self, class_name=None, *, rtol=1e-9, **params):
+        '''Runs of class_name (any if None) with parameters equal to
+        params (numbers to relative tolerance rtol), newest first.
+        Returns DataFrame with the runs columns (params decoded).'''
+        conditions, values = [], []
+        if class_name is not None:
+            conditions.append('class = ?')
+            values.append(class_name)
+        for name, value in params.items():
+            value = param_value(value)
+            if isinstance(value, (bool, list, tuple, dict)) or value is None:
+                value = json.dumps(value)
+            if isinstance(value, str):
+                match = 'value_text = ?'
+                values.extend([name, value])
+            else:
+                match = 'ABS(value_real - ?) <= ? * ABS(?)'
+                values.extend([name, value, rtol, value])
+            conditions.append('EXISTS (SELECT 1 FROM params WHERE '
+                              'params.save_name = runs.save_name AND '
+                              f'name = ? AND {match})')
+
+        import pandas as pd
+        sql = 'SELECT * FROM runs'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY execution_time DESC'
+        with self.connect() as connection:
+            table = pd.read_sql_query(sql, connection, params=values)
+        connection.close()
+        table['sets'] = table['sets'].map(json.loads)
+        table['params'] = table['params'].map(json.loads)
+        return table
+
+    def load(self, save_name):
+        '''Solver of run save_name loaded with import_previous=True'''
+        import spectralGFD
+        table = self.query(save_name=save_name)
+        if len(table) == 0:
+            raise KeyError(f'{save_name} not in catalog')
+        params = table['params'][0]
+        solver_class = getattr(spectralGFD, table['class'][0])
+        return solver_class(params['Nphi'], params['Nr'], None,
+                            save_name=save_name, import_previous=True)
+
+
+run_catalog = RunCatalog()
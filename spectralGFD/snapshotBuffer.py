@@ -0,0 +1,107 @@
+import logging
+import numpy as np
+logger = logging.getLogger(__name__)
+
+
+class SnapshotBuffer:
+    '''
+    Preallocated contiguous store of snapshots, shape
+    (n_frames, Nphi*scales, Nr*scales), for local time_PDE runs.
+    Allocated on the first append (so only on the rank that appends).
+
+    n_frames = expected number of frames (grows by doubling if exceeded)
+    dtype = storage dtype (e.g. np.float32 to halve memory)
+    keep_last = K: ring buffer keeping only the last K frames
+
+    Indexing buffer[k] and buffer.times are in chronological order.
+    '''
+    def __init__(self, n_frames, dtype=np.float64, keep_last=None):
+        if keep_last is not None:
+            n_frames = keep_last
+
+        # Export vars
+        self.n_frames = n_frames
+        self.dtype = dtype
+        self.keep_last = keep_last
+        self.data = None
+        self._times = np.empty(n_frames)
+        self.count = 0  # Total frames appended
+
+    def _allocate(self, shape):
+        '''Allocate frame storage'''
+        self.data = np.empty((self.n_frames,) + shape, dtype=self.dtype)
+
+    def _grow(self):
+        '''Double capacity (unbounded mode only)'''
+        logger.warning('SnapshotBuffer full (%i frames), growing'
+                       % self.n_frames)
+        data = np.empty((2 * self.n_frames,) + self.data.shape[1:],
+                        dtype=self.dtype)
+        data[:self.n_frames] = self.data
+        self.data = data
+        self._times = np.concatenate([self._times, np.empty(self.n_frames)])
+        self.n_frames *= 2
+
+    def append(self, frame, t):
+        '''Copy frame (array) at time t into the buffer'''
+        if self.data is None:
+            self._allocate(np.shape(frame))
+        if self.keep_last is None and self.count == self.n_frames:
+            self._grow()
+
+        i = self.count % self.n_frames
+        np.copyto(self.data[i], frame, casting='unsafe')
+        self._times[i] = t
+        self.count += 1
+
+    def append_field(self, field, t):
+        '''Append grid data of Dedalus field (gathered to rank 0).
+        In serial the field data is copied straight into the buffer.'''
+        if field.dist.comm.size == 1:
+            frame = field['g']
+        else:
+            frame = field.gather_data(layout='g')
+        if frame is not None:
+            self.append(frame, t)
+
+    def __len__(self):
+        return min(self.count, self.n_frames)
+
+    def _index(self, k):
+        '''Storage index of chronological frame k'''
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError('frame index out of range')
+        if self.count <= self.n_frames:
+            return k
+        return (self.count + k) % self.n_frames
+
+    def __getitem__(self, k):
+        return self.data[self._index(k)]
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    @property
+    def times(self):
+        '''Snapshot times in chronological order'''
+        if self.count <= self.n_frames:
+            return self._times[:self.count]
+        return np.roll(self._times, -(self.count % self.n_frames))
+
+    @property
+    def frames(self):
+        '''All frames in chronological order (a view unless the
+        ring buffer has wrapped)'''
+        if self.data is None:
+            return np.empty((0,))
+        if self.count <= self.n_frames:
+            return self.data[:self.count]
+        return np.roll(self.data, -(self.count % self.n_frames), axis=0)
+
+    @property
+    def nbytes(self):
+        return 0 if self.data is None else self.data.nbytes
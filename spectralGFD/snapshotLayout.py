@@ -0,0 +1,40 @@
+import numpy as np
+
+COMPRESSIONS = (None, 'gzip', 'lzf')
+
+
+def set_file_layout(handler, dtype=None, chunk_frames=None,
+                    compression=None, compression_opts=None):
+    '''HDF5 layout of the task datasets of a Dedalus gather file handler
+    (call before the first write).
+
+    dtype = storage dtype, e.g. np.float32 (data is cast on write)
+    chunk_frames = k: chunks of k whole frames along time, so reading
+                   one frame touches one chunk (None: h5py default)
+    compression = 'gzip' (compression_opts = level 0-9) or 'lzf';
+                  uses the shuffle filter and chunk_frames=1 if unset
+    '''
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'Unknown compression {compression} '
+                         f'(use one of {COMPRESSIONS})')
+    if compression is not None and chunk_frames is None:
+        chunk_frames = 1
+
+    def create_task_dataset(file, task):
+        '''As H5FileHandlerBase.create_task_dataset, with layout'''
+        shape = (1,) + task['global_shape']
+        maxshape = (handler.max_writes,) + task['global_shape']
+        kwargs = {}
+        if chunk_frames is not None:
+            kwargs['chunks'] = (chunk_frames,) + task['global_shape']
+        if compression is not None:
+            kwargs['compression'] = compression
+            kwargs['compression_opts'] = compression_opts
+            kwargs['shuffle'] = True
+        return file['tasks'].create_dataset(
+            name=task['name'], shape=shape, maxshape=maxshape,
+            dtype=task['dtype'] if dtype is None else np.dtype(dtype),
+            **kwargs)
+
+    handler.create_task_dataset = create_task_dataset
+    return handler
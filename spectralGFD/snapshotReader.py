@@ -0,0 +1,338 @@
+import os
+import re
+import glob
+import json
+import logging
+from collections import OrderedDict
+import h5py
+import numpy as np
+from mpi4py import MPI
+from .parallel import use_comm, global_grids
+from .spaceCache import space_cache
+logger = logging.getLogger(__name__)
+
+
+def set_files(save_name, folder='saves'):
+    '''{set number: path} of the HDF5 set files of save_name'''
+    pattern = os.path.join(folder, save_name,
+                           f'{glob.escape(save_name)}_s*.h5')
+    files = {}
+    for path in glob.glob(pattern):
+        match = re.search(r'_s(\d+)\.h5$', path)
+        if match:
+            files[int(match.group(1))] = path
+    return dict(sorted(files.items()))
+
+
+class SnapshotReader:
+    '''
+    Lazy reader of a file run spanning all set files
+    saves/save_name/save_name_s1.h5, _s2.h5, ...
+
+    The time index (global frame -> (set file, local index)) and the
+    phi, r grids are read once. Frames are read on access, with at
+    most `max_open` files open and the last `cache_frames` frames
+    kept in an LRU cache. Frames superseded by a later set (a run
+    resumed from a checkpoint rewrites times after the checkpoint)
+    are skipped, so times are increasing.
+
+    reader[k] = frame k (negative k from the end), shape (Nphi, Nr)
+    reader.at_time(t) = frame nearest to time t
+    reader.times, reader.phi, reader.r
+
+    sets = set numbers to read (default all)
+    '''
+    def __init__(self, save_name, variable_name='q', *, folder='saves',
+                 sets=None, max_open=4, cache_frames=16):
+        # Export vars
+        self.save_name = save_name
+        self.variable_name = variable_name
+        self.folder = folder
+        self.sets = sets
+        self.max_open = max_open
+        self.cache_frames = cache_frames
+        self._handles = OrderedDict()
+        self._frames = OrderedDict()
+        self.refresh()
+
+    def refresh(self):
+        '''(Re)build the time index, e.g. while the run is writing'''
+        files = set_files(self.save_name, self.folder)
+        if self.sets is not None:
+            files = {num: files[num] for num in self.sets}
+        if not files:
+            raise FileNotFoundError(f'No set files for {self.save_name} '
+                                    f'in {self.folder}')
+        self.close()
+
+        paths, times, file_inds, local_inds = [], [], [], []
+        for num, path in files.items():
+            with h5py.File(path, mode='r') as file:
+                dset = file['tasks'][self.variable_name]
+                t_list = dset.dims[0][0][:]
+                if not paths:
+                    self.phi = dset.dims[1][0][:]
+                    self.r = dset.dims[2][0][:]
+                    self.shape = dset.shape[1:]
+                    self.dtype = dset.dtype
+                    grid_space = dset.attrs.get('grid_space', True)
+                    self.grid_space = bool(np.all(grid_space))
+            if len(t_list) == 0:
+                continue
+            # Drop frames rewritten by this set
+            keep = [i for i, t in enumerate(times) if t < t_list[0]]
+            times = [times[i] for i in keep]
+            file_inds = [file_inds[i] for i in keep]
+            local_inds = [local_inds[i] for i in keep]
+
+            times.extend(t_list)
+            file_inds.extend([len(paths)] * len(t_list))
+            local_inds.extend(range(len(t_list)))
+            paths.append(path)
+
+        self.paths = paths
+        self.mtimes = {path: os.path.getmtime(path)
+                       for path in files.values()}
+        self.times = np.array(times)
+        self.file_inds = np.array(file_inds, dtype=int)
+        self.local_inds = np.array(local_inds, dtype=int)
+
+    def stale(self):
+        '''True if set files were added or modified since refresh'''
+        files = set_files(self.save_name, self.folder)
+        if self.sets is not None:
+            files = {num: files[num] for num in self.sets if num in files}
+        return {path: os.path.getmtime(path)
+                for path in files.values()} != self.mtimes
+
+    def _dataset(self, file_ind):
+        '''Dataset of variable in set file, keeping max_open files open'''
+        if file_ind in self._handles:
+            self._handles.move_to_end(file_ind)
+        else:
+            if len(self._handles) >= self.max_open:
+                old_ind, old_file = self._handles.popitem(last=False)
+                old_file.close()
+            self._handles[file_ind] = h5py.File(self.paths[file_ind],
+                                                mode='r')
+        return self._handles[file_ind]['tasks'][self.variable_name]
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, k):
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError('frame index out of range')
+        if k in self._frames:
+            self._frames.move_to_end(k)
+            return self._frames[k]
+
+        frame = self._dataset(self.file_inds[k])[self.local_inds[k]]
+        frame.flags.writeable = False  # Shared via the cache
+        self._frames[k] = frame
+        if len(self._frames) > self.cache_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def index(self, t):
+        '''Index of frame nearest to time t'''
+        k = np.searchsorted(self.times, t)
+        if k == len(self):
+            return k - 1
+        if k > 0 and t - self.times[k - 1] < self.times[k] - t:
+            return k - 1
+        return int(k)
+
+    def at_time(self, t):
+        '''Frame nearest to time t'''
+        return self[self.index(t)]
+
+    def close(self):
+        '''Close open files and drop cached frames'''
+        for file in self._handles.values():
+            file.close()
+        self._handles.clear()
+        self._frames.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def trig_interp(values, phi, phi0=0):
+    '''Trigonometric interpolant of values on the uniform grid
+    phi0 + 2 pi j / N, evaluated at phi (exact for band-limited data)'''
+    N = len(values)
+    coeffs = np.fft.rfft(values) / N
+    weights = np.full(len(coeffs), 2.0)
+    weights[0] = 1
+    if N % 2 == 0:
+        weights[-1] = 1  # Nyquist
+    m = np.arange(len(coeffs))
+    phase = np.exp(1j * np.multiply.outer(np.asarray(phi) - phi0, m))
+    return np.real(phase @ (weights * coeffs))
+
+
+class SpectralReader:
+    '''
+    Reader of a file run stored in coefficient layout
+    (time_PDE(..., output_layout='c')): frames are Nphi x Nr
+    coefficients, regridded on demand on a serial copy of the disk
+    basis (Nphi, Nr, Lr, dealias from params.json).
+
+    reader[k] = grid of frame k at `scales` (default: scales of the
+                run), LRU cached like SnapshotReader
+    reader.grid(k, scales) = grid at any scales, e.g. (1.5, 2)
+    reader.points(k, phi, r) = values at arbitrary points (exact
+                interpolation in r, trigonometric in phi)
+    reader.phi, reader.r = grids at `scales`
+    '''
+    def __init__(self, save_name, variable_name='q', *, scales=None,
+                 folder='saves', sets=None, max_open=4, cache_frames=16):
+        self.coeffs = SnapshotReader(save_name, variable_name, folder=folder,
+                                     sets=sets, max_open=max_open,
+                                     cache_frames=cache_frames)
+        with open(os.path.join(folder, save_name, 'params.json')) as file:
+            params = json.load(file)
+        if scales is None:
+            scales = params.get('scales', 1)
+        dealias = params['dealias']
+        if isinstance(dealias, list):  # Tuples are stored as lists
+            dealias = tuple(dealias)
+        if isinstance(scales, list):
+            scales = tuple(scales)
+
+        with use_comm(MPI.COMM_SELF):
+            coords, dist, disk, phi, r = space_cache.get(
+                params['Nphi'], params['Nr'], params['Lr'], dealias)
+
+        # Export vars
+        self.save_name = save_name
+        self.variable_name = variable_name
+        self.scales = scales
+        self.cache_frames = cache_frames
+        self.coords = coords
+        self.dist = dist
+        self.disk = disk
+        self.field = dist.Field(name=variable_name, bases=disk)
+        self.phi, self.r = self.grids(scales)
+        self._frames = OrderedDict()
+
+    @property
+    def times(self):
+        return self.coeffs.times
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def refresh(self):
+        self.coeffs.refresh()
+        self._frames.clear()
+
+    def stale(self):
+        return self.coeffs.stale()
+
+    def grids(self, scales=1):
+        '''1D phi, r grids at scales'''
+        phi, r = global_grids(self.dist, self.disk, scales)
+        return phi.ravel(), r.ravel()
+
+    def load(self, k):
+        '''Field holding coefficients of frame k'''
+        field = self.field
+        field.change_scales(1)
+        field['c'] = self.coeffs[k]
+        return field
+
+    def grid(self, k, scales=None):
+        '''Grid values of frame k at scales (default self.scales)'''
+        if scales is None:
+            scales = self.scales
+        field = self.load(k)
+        field.change_scales(scales)
+        return np.copy(field['g'])
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        if k in self._frames:
+            self._frames.move_to_end(k)
+            return self._frames[k]
+        frame = self.grid(k)
+        frame.flags.writeable = False
+        self._frames[k] = frame
+        if len(self._frames) > self.cache_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def index(self, t):
+        return self.coeffs.index(t)
+
+    def at_time(self, t):
+        return self[self.index(t)]
+
+    def points(self, k, phi, r):
+        '''Values of frame k at points (phi, r) (broadcast arrays):
+        exact interpolation to each distinct r, then a trigonometric
+        interpolant in phi'''
+        field = self.load(k)
+        phi, r = np.broadcast_arrays(np.asarray(phi, dtype=float),
+                                     np.asarray(r, dtype=float))
+        values = np.empty(phi.shape)
+        for r0 in np.unique(r):
+            ring = field(r=r0).evaluate()
+            ring.change_scales(1)
+            ring_phi = self.dist.local_grids(ring.domain.bases[0])[0]
+            mask = (r == r0)
+            values[mask] = trig_interp(np.ravel(ring['g']), phi[mask],
+                                       phi0=np.ravel(ring_phi)[0])
+        return values
+
+    def close(self):
+        self.coeffs.close()
+        self._frames.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+_readers = OrderedDict()
+
+
+def snapshot_reader(save_name, variable_name='q', sets=None, maxsize=4):
+    '''Shared reader of save_name (refreshed if the set files
+    changed): SnapshotReader, or SpectralReader for runs stored in
+    coefficient layout. Keeps the last maxsize readers open.'''
+    key = (save_name, variable_name,
+           None if sets is None else tuple(sets))
+    reader = _readers.get(key)
+    if reader is None:
+        reader = SnapshotReader(save_name, variable_name, sets=sets)
+        if reader.grid_space is False:
+            reader.close()
+            reader = SpectralReader(save_name, variable_name, sets=sets)
+        _readers[key] = reader
+        if len(_readers) > maxsize:
+            old_key, old_reader = _readers.popitem(last=False)
+            old_reader.close()
+    else:
+        _readers.move_to_end(key)
+        if reader.stale():
+            reader.refresh()
+    return reader
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+import numpy as np
+import dedalus.public as d3
+from .parallel import get_comm
+
+
+class SpaceCache:
+    '''
+    Process-level LRU cache of Dedalus spaces, i.e.
+    (coords, dist, disk, phi, r), keyed by (Nphi, Nr, Lr, dealias, dtype),
+    MPI mesh and communicator.
+    Solvers at the same resolution share bases and grids.
+
+    Useful methods:
+    get = return cached space (building on miss)
+    info = hit/miss counters
+    clear = empty cache and reset counters
+    '''
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.spaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(Nphi, Nr, Lr, dealias, dtype, mesh=None):
+        '''Hashable cache key'''
+        if isinstance(dealias, (list, tuple, np.ndarray)):
+            dealias = tuple(float(d) for d in dealias)
+        else:
+            dealias = float(dealias)
+        if mesh is not None:
+            mesh = tuple(int(m) for m in mesh)
+        return (int(Nphi), int(Nr), float(Lr), dealias, np.dtype(dtype).str,
+                mesh, id(get_comm()))
+
+    def build(self, Nphi, Nr, Lr, dealias, dtype, mesh=None):
+        '''Build Dedalus coords, distributor, disk basis and local grids'''
+        coords = d3.PolarCoordinates('phi', 'r')
+        dist = d3.Distributor(coords, comm=get_comm(), dtype=dtype, mesh=mesh)
+        disk = d3.DiskBasis(coords, shape=(Nphi, Nr), radius=Lr,
+                            dealias=dealias, dtype=dtype)  # Circular domain
+        phi, r = dist.local_grids(disk)
+        return coords, dist, disk, phi, r
+
+    def get(self, Nphi, Nr, Lr=1, dealias=1, dtype=np.float64, mesh=None):
+        '''Return (coords, dist, disk, phi, r), built on a miss'''
+        key = self.key(Nphi, Nr, Lr, dealias, dtype, mesh)
+        if key in self.spaces:
+            self.hits += 1
+            self.spaces.move_to_end(key)
+            return self.spaces[key]
+
+        self.misses += 1
+        space = self.build(Nphi, Nr, Lr, dealias, dtype, mesh)
+        self.spaces[key] = space
+        while len(self.spaces) > self.maxsize:
+            self.spaces.popitem(last=False)  # Evict least recently used
+        return space
+
+    def info(self):
+        '''Dict of cache counters'''
+        calls = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / calls if calls else 0.,
+                'size': len(self.spaces), 'maxsize': self.maxsize}
+
+    def clear(self):
+        '''Empty cache and reset counters'''
+        self.spaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+space_cache = SpaceCache()
@@ -0,0 +1,56 @@
+from collections import deque
+import numpy as np
+from mpi4py import MPI
+
+
+class SteadyStateMonitor:
+    '''
+    Convergence monitor for time_PDE runs.
+
+    At each check the coefficient data of `fields` is compared with
+    the previous check: change = max over fields of
+    ||x_now - x_prev|| / ||x_now|| (2-norm of coefficients, global
+    over MPI ranks). Steady once the last `window` changes are all
+    below `tol`.
+
+    Call check() every few iterations (state is already in
+    coefficient space after solver.step, so this is cheap).
+    '''
+    def __init__(self, fields, tol, window=3):
+        # Export vars
+        self.fields = fields
+        self.tol = tol
+        self.window = window
+        self.comm = fields[0].dist.comm
+        self.previous = None
+        self.changes = deque(maxlen=window)
+
+    def norm(self, data):
+        '''Global 2-norm of distributed coefficient data'''
+        local_sq = np.sum(np.abs(data)**2)
+        return np.sqrt(self.comm.allreduce(local_sq, op=MPI.SUM))
+
+    def check(self):
+        '''Record change since last check; True if steady'''
+        current = [np.copy(field['c']) for field in self.fields]
+        if self.previous is not None:
+            change = 0
+            for now, before in zip(current, self.previous):
+                size = self.norm(now)
+                if size > 0:
+                    change = max(change, self.norm(now - before) / size)
+                elif self.norm(before) > 0:
+                    change = np.inf
+            self.changes.append(change)
+        self.previous = current
+        return self.steady
+
+    @property
+    def steady(self):
+        return (len(self.changes) == self.window
+                and max(self.changes) < self.tol)
+
+    @property
+    def change(self):
+        '''Most recent relative change'''
+        return self.changes[-1] if self.changes else np.inf
@@ -1,4 +1,6 @@
-from spectralGFD import *
+import numpy as np
+import dedalus.public as d3
+from .timeSolver import time_PDE
 
 class stommel_PDE(time_PDE):
     def make_problem(self):
@@ -67,9 +69,21 @@ class stommel_PDE(time_PDE):
         self.tau_zeta = tau_zeta
         self.tau_psi = tau_psi
         self.t = t
+        self.velocity = d3.skew(d3.grad(psi))
         self.problem = problem
         self.variable_name = 'psi'
 
+    def steady_fields(self):
+        '''Fields checked for steady state'''
+        return [self.zeta, self.psi]
+
+    def default_diagnostics(self):
+        '''Kinetic energy, enstrophy, max |psi| and circulation'''
+        return {'KE': ('0.5 * grad(psi) @ grad(psi)', 'integ'),
+                'enstrophy': ('0.5 * zeta**2', 'integ'),
+                'max_psi': ('psi', 'max_abs'),
+                'circulation': ('zeta', 'integ')}
+
     def initial_condition(self, psi, zeta):
         '''Set initial conds'''
         # Tau method
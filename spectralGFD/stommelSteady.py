@@ -0,0 +1,166 @@
+import logging
+import numpy as np
+import dedalus.public as d3
+from .parallel import global_grids
+from .basicSolver import DedalusSolver
+logger = logging.getLogger(__name__)
+
+
+class stommel_steady(DedalusSolver):
+    '''
+    Subclass of `DedalusSolver`. Equilibrium of `stommel_PDE`
+    as a nonlinear boundary value problem, solved by Newton iteration:
+        r0 lap(psi) - nu lap(zeta) + J(psi, zeta + beta y) = Q;
+        lap(psi) = zeta;
+        psi(r=Lr) = 0, zeta(r=Lr) = 0, BC.
+
+    Input:
+    Nphi, Nr = Grid spacing
+    F, H, r0, beta, nu, rho0, Q_shift = constants as in stommel_PDE
+    tol = Newton tolerance on the perturbation norm relative
+          to the state norm
+    damping = Newton damping (1 = full steps)
+
+    Useful methods:
+    continuation = solve along a list of parameter dicts
+                   (e.g. decreasing nu), each seeded by the last
+
+    'psig', 'zetag' output np.array (rank 0). 'psi', 'zeta' dedalus objects
+    '''
+    def __init__(self, Nphi, Nr, *, Lr=1, dealias=2, tol=1e-10,
+                 max_iterations=20, damping=1, mesh=None, **kwargs):
+        # Export vars
+        self.Nphi = Nphi
+        self.Nr = Nr
+        self.Lr = Lr
+        self.dealias = dealias
+        self.tol = tol
+        self.max_iterations = max_iterations
+        self.damping = damping
+        self.process_mesh = mesh
+        self.__dict__.update(kwargs)
+
+        # Run
+        self.run()
+
+    def make_problem(self):
+        '''Make NLBVP with steady Stommel-Munk equation. Parameters
+        are constant fields, so continuation reuses the problem.'''
+        # Import vars
+        dist = self.dist
+        disk = self.disk
+        edge = self.edge
+        Lr = self.Lr
+
+        # Fields
+        psi = dist.Field(name='psi', bases=disk)
+        zeta = dist.Field(name='zeta', bases=disk)
+        tau_zeta = dist.Field(name='tau_zeta', bases=edge)
+        tau_psi = dist.Field(name='tau_psi', bases=edge)
+
+        # Substitutions
+        phi, r = dist.local_grids(disk)
+        y = dist.Field(name='y', bases=disk)
+        y['g'] = r * np.sin(phi)
+        Q = dist.Field(name='Q', bases=disk)
+        r0 = dist.Field(name='r0')
+        nu = dist.Field(name='nu')
+        beta = dist.Field(name='beta')
+
+        def lift(A, i=-1):
+            lift_basis = disk.derivative_basis()
+            return d3.Lift(A, lift_basis, i)
+
+        # Problem
+        problem = d3.NLBVP([zeta, psi, tau_zeta, tau_psi], namespace=locals())
+        problem.add_equation("r0 * lap(psi) - nu * lap(zeta) + lift(tau_zeta, -2) \
+                             + skew(grad(psi)) @ grad(zeta + beta * y) = Q")
+        problem.add_equation("lap(psi) - zeta + lift(tau_psi, -1) = 0")
+        problem.add_equation("psi(r=Lr) = 0")
+        problem.add_equation("zeta(r=Lr) = 0")
+
+        # Export vars
+        self.psi = psi
+        self.zeta = zeta
+        self.Q = Q
+        self.y = y
+        self.r0_field = r0
+        self.nu_field = nu
+        self.beta_field = beta
+        self.problem = problem
+        self.set_parameters()
+
+    def set_parameters(self):
+        '''Copy constants into the problem fields'''
+        # Import vars
+        dist = self.dist
+        disk = self.disk
+        Lr = self.Lr
+        F = self.F
+        H = self.H
+        rho0 = self.rho0
+        Q_shift = self.Q_shift
+
+        phi, r = dist.local_grids(disk)
+        self.Q.change_scales(1)
+        self.Q['g'] = (F * np.pi / (rho0 * Lr * H)) *\
+            np.sin(np.pi * (r * np.sin(phi) + Lr*Q_shift) / Lr)
+        self.r0_field['g'] = self.r0
+        self.nu_field['g'] = self.nu
+        self.beta_field['g'] = self.beta
+
+    def newton(self):
+        '''Newton iterate from the current state until the relative
+        perturbation norm is below tol. Returns iterations used.'''
+        solver = self.solver
+        rel_norm = np.inf
+        iterations = 0
+        while rel_norm > self.tol:
+            if iterations == self.max_iterations:
+                raise RuntimeError('Newton did not converge in %i iterations'
+                                   ' (relative perturbation norm %e)'
+                                   % (iterations, rel_norm))
+            solver.newton_iteration(damping=self.damping)
+            pert_norm = sum(pert.allreduce_data_norm('c', 2)
+                            for pert in solver.perturbations)
+            state_norm = sum(var.allreduce_data_norm('c', 2)
+                             for var in (self.psi, self.zeta))
+            rel_norm = pert_norm / state_norm if state_norm > 0 else pert_norm
+            iterations += 1
+            logger.info('Newton iteration=%i, relative perturbation norm=%e'
+                        % (iterations, rel_norm))
+        return iterations
+
+    def solve_problem(self, local=None, save_every=None, save_name=None):
+        '''Solve steady problem from zero initial guess'''
+        # Import vars
+        dist = self.dist
+        disk = self.disk
+
+        # Solver
+        self.solver = self.problem.build_solver()
+        self.newton_iterations = self.newton()
+        self.gather()
+
+        # Export vars
+        self.phi, self.r = global_grids(dist, disk)
+
+    def gather(self):
+        '''Gather psi and zeta to rank 0'''
+        self.psi.change_scales(1)
+        self.zeta.change_scales(1)
+        self.psig = self.psi.gather_data(layout='g')
+        self.zetag = self.zeta.gather_data(layout='g')
+        self.ug = self.psig
+
+    def continuation(self, params_list):
+        '''Generator solving for each dict of constants in params_list
+        (e.g. [{'nu': 200}, {'nu': 100}, {'nu': 80}]), seeding Newton
+        with the previous converged state.
+        Yields (params, psig, zetag) per step (arrays on rank 0).'''
+        for params in params_list:
+            self.__dict__.update(params)
+            self.set_parameters()
+            self.newton_iterations = self.newton()
+            self.gather()
+            yield params, self.psig, self.zetag
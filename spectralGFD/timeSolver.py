@@ -1,8 +1,24 @@
-from spectralGFD import *
 import logging
+import numpy as np
 import dedalus.public as d3
-import matplotlib.pyplot as plt
+import os
 import json
+import time
+from .parallel import bcast, global_grids, is_root, root_only
+from .errorNorms import NORMS, error_norms
+from .runCache import run_key, run_cache
+from .runCatalog import run_catalog
+from .snapshotBuffer import SnapshotBuffer
+from .snapshotLayout import set_file_layout
+from .snapshotReader import snapshot_reader
+from .asyncOutput import AsyncOutput, async_file_handler
+from .checkpoint import load_checkpoint, save_checkpoint
+from .diagnostics import Diagnostics
+from .steadyState import SteadyStateMonitor
+from .performance import PerformanceMonitor
+from .figureOutput import (figure_output, headless, is_headless, show,
+                           clear_output)
+from .basicSolver import DedalusSolver
 logger = logging.getLogger(__name__)
 
 
@@ -11,18 +27,88 @@ class time_PDE(DedalusSolver):
     Subclass of `DedalusSolver`.
 
     IMPORTANT: create make_problem manually in subclass.
+    For adaptive=True, make_problem must also set self.velocity
+    (advecting velocity used for the CFL condition).
 
     Useful methods:
     time_plot = plot PDE at specific times
     animate = create video over all time
+    save_animation = render frames to PNGs or MP4 (optionally parallel)
+    export_figures = write all figures of a run to files (headless)
     animate_old = old animation method
+    snapshot_errors = error norms of all local snapshots
     solve_problem
+
+    MPI: run with `mpiexec -n N`; snapshots, params.json
+    and plots are written by rank 0.
+
+    Restart (local=False): checkpoint_every = N writes the full
+    solver state to saves/save_name/checkpoints every N iterations
+    (and at the end). Rerun with the same arguments plus
+    resume=True and save_name to continue from the latest
+    checkpoint; snapshots continue in new set files.
+
+    Diagnostics: diagnostics_every = N evaluates scalar diagnostics
+    (default: default_diagnostics of subclass) every N iterations into
+    diagnostics_table, and for local=False appends them to
+    saves/save_name/diagnostics.csv during the run.
+
+    Early stop: steady_tol = tol stops the run once the relative
+    change of steady_fields() between checks (every steady_every
+    iterations) stays below tol for steady_window checks. A final
+    snapshot is written and equilibrium_time recorded in params.json.
+
+    Cache (opt-in): with cache=True, local=False runs without a
+    save_name are stored as saves/Run <key> <class>, key = run_key
+    (class, resolution, timestepper, constants, diagnostics, source
+    of initial_func...). A finished run with the same key is loaded
+    instead of simulated. Cached folders are only deleted by
+    run_cache.evict/invalidate, or automatically if
+    run_cache.max_bytes is set.
+
+    Asynchronous output: async_output=True only stages grids (at
+    scales, transformed on the main thread) in the time loop; HDF5
+    writes (or copies into q_list) run on a writer thread, at most
+    max_pending frames behind (see AsyncOutput).
+
+    File layout (local=False): output_tasks = list of state variable
+    names (or expressions) to write (default all of solver.state,
+    tau fields included); output_dtype (e.g. np.float32),
+    output_chunk_frames, output_compression ('gzip', 'lzf') and
+    output_compression_opts set the HDF5 layout (see set_file_layout).
+    output_layout='c' stores Nphi x Nr coefficients instead of grids
+    at scales; time_plot/animate (via snapshot_reader) and
+    SpectralReader regrid them on demand.
+
+    Finished file runs are indexed in run_catalog (saves/catalog.sqlite),
+    e.g. run_catalog.query('stommel_PDE', Nr=256, nu=80).
+
+    Headless: set_headless() (or SPECTRALGFD_HEADLESS=1) uses the Agg
+    backend; plots are written to files and closed instead of shown,
+    and IPython is not used (see FigureOutput).
+
+    Performance: progress is logged every 100 iterations with it/s,
+    sim time / wall time and ETA; self.perf (also in params.json)
+    summarises step time percentiles, output time and peak RSS
+    (see PerformanceMonitor).
     '''
     def __init__(self, Nphi, Nr, initial_func, *,
                  Lr=1, dealias=2,
                  timestepper=d3.SBDF2, stop_sim_time=np.pi/2, timestep=0.1,
                  local=True, save_every=1, save_name=None, scales=1,
-                 import_previous=False, variable_name=None, **kwargs):
+                 import_previous=False, variable_name=None, mesh=None,
+                 adaptive=False, cfl_safety=0.5, cfl_max_dt=None,
+                 cfl_min_dt=0, cfl_threshold=0.05, cfl_max_change=1.5,
+                 cfl_min_change=0.5, cfl_cadence=10,
+                 snapshot_dtype=np.float64, keep_last=None,
+                 checkpoint_every=None, keep_checkpoints=2, resume=False,
+                 diagnostics=None, diagnostics_every=None,
+                 steady_tol=None, steady_every=100, steady_window=3,
+                 cache=False, async_output=False, max_pending=4,
+                 output_tasks=None, output_dtype=None,
+                 output_chunk_frames=None, output_compression=None,
+                 output_compression_opts=None, output_layout='g',
+                 **kwargs):
         # Export vars
         self.Nphi = Nphi
         self.Nr = Nr
@@ -38,11 +124,54 @@ class time_PDE(DedalusSolver):
         self.import_previous = import_previous
         self.variable_name = variable_name
         self.scales = scales
+        self.process_mesh = mesh
+        self.adaptive = adaptive
+        self.cfl_safety = cfl_safety
+        self.cfl_max_dt = cfl_max_dt
+        self.cfl_min_dt = cfl_min_dt
+        self.cfl_threshold = cfl_threshold
+        self.cfl_max_change = cfl_max_change
+        self.cfl_min_change = cfl_min_change
+        self.cfl_cadence = cfl_cadence
+        self.snapshot_dtype = snapshot_dtype
+        self.keep_last = keep_last
+        self.checkpoint_every = checkpoint_every
+        self.keep_checkpoints = keep_checkpoints
+        self.resume = resume
+        self.diagnostics = diagnostics
+        self.diagnostics_every = diagnostics_every
+        self.steady_tol = steady_tol
+        self.steady_every = steady_every
+        self.steady_window = steady_window
+        self.cache = cache
+        self.async_output = async_output
+        self.max_pending = max_pending
+        self.output_tasks = output_tasks
+        self.output_dtype = output_dtype
+        self.output_chunk_frames = output_chunk_frames
+        self.output_compression = output_compression
+        self.output_compression_opts = output_compression_opts
+        self.output_layout = output_layout
         self.__dict__.update(kwargs)
 
+        # Reuse finished identical file run (see RunCache)
+        cache_key = None
+        if cache is True and local is False and save_name is None \
+                and import_previous is False and resume is False:
+            cache_key = run_key(self)
+            entry = bcast(run_cache.lookup(cache_key) if is_root() else None)
+            if entry is not None:
+                logger.info('Reusing cached run %s' % entry['folder'])
+                save_name = entry['folder']
+                import_previous = True
+            else:
+                save_name = f'Run {cache_key} {self.__class__.__name__}'
+
         # Run
         if import_previous is False:
             self.run(local=local, save_every=save_every, save_name=save_name)
+            if cache_key is not None and is_root():
+                run_cache.add(cache_key, save_name, self.__class__.__name__)
         else:
             with open(f'saves/{save_name}/params.json') as json_file:
                 data = json.load(json_file)
@@ -50,9 +179,12 @@ class time_PDE(DedalusSolver):
 
     def solve_problem(self, *, local=True, save_every=None, save_name=None):
         '''Solve PDE with given timestepper
-        local = True : outputs to variable q_list
+        local = True : outputs to q_list (a preallocated SnapshotBuffer,
+                       see snapshot_dtype and keep_last)
         local = False: outputs to file=filename (default classname + time)
         sim_dt: output every sim_dt time
+        adaptive = True: CFL timestep from self.velocity (see make_cfl)
+        resume = True: continue from latest checkpoint of save_name
         '''
         # Import vars
         dist = self.dist
@@ -63,10 +195,17 @@ class time_PDE(DedalusSolver):
         timestep = self.timestep
         stop_sim_time = self.stop_sim_time
         save_every = self.save_every
+        adaptive = self.adaptive
+        checkpoint_every = self.checkpoint_every
+        resume = self.resume
+
+        if resume is True and (local is True or save_name is None):
+            raise ValueError('resume=True needs local=False and save_name')
 
         time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         if save_name is None:
             save_name = 'Snapshots ' + time_str + ' ' + self.__class__.__name__
+        save_name = bcast(save_name)  # Same folder on all ranks
 
         sim_dt = save_every * timestep
 
@@ -74,59 +213,233 @@ class time_PDE(DedalusSolver):
         solver = problem.build_solver(self.timestepper)
         solver.stop_sim_time = stop_sim_time
 
-        # Main loop (external)
+        # Output (external)
+        writer = None
         if local is False:
+            mode = 'append' if resume is True else 'overwrite'
+            layout = (self.output_dtype, self.output_chunk_frames,
+                      self.output_compression)
+            parallel = None
+            if self.async_output is True or layout != (None, None, None):
+                parallel = 'gather'
             snapshots = solver.evaluator.add_file_handler(f'saves/{save_name}',
-                                                          sim_dt=sim_dt)
-            snapshots.add_tasks(solver.state, layout='g', scales=self.scales)
-
-            while solver.proceed:
-                solver.step(timestep)
-                if solver.iteration % 100 == 0:
-                    logger.info('Iteration=%i, Time=%e, dt=%e'
-                                % (solver.iteration, solver.sim_time,
-                                   timestep))
-            end_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-            logger.info('Done!')
+                                                          sim_dt=sim_dt,
+                                                          mode=mode,
+                                                          parallel=parallel)
+            output_layout = self.output_layout
+            if self.output_tasks is None:
+                snapshots.add_tasks(solver.state, layout=output_layout,
+                                    scales=self.scales)
+            else:
+                for task in self.output_tasks:
+                    snapshots.add_task(task, layout=output_layout,
+                                       scales=self.scales, name=task)
+            if parallel == 'gather':
+                set_file_layout(snapshots, self.output_dtype,
+                                self.output_chunk_frames,
+                                self.output_compression,
+                                self.output_compression_opts)
+            handlers = [snapshots]
+            checkpoint_folder = f'saves/{save_name}/checkpoints'
+            if self.async_output is True:
+                writer = async_file_handler(snapshots, disk, self.Nphi,
+                                            self.Nr, self.Lr, self.dealias,
+                                            max_pending=self.max_pending)
+
+        # Restart
+        dt = timestep
+        if resume is True:
+            last_dt = load_checkpoint(solver, checkpoint_folder, handlers)
+            if np.isfinite(last_dt):
+                dt = last_dt
+        start_sim_time = solver.sim_time
+
+        if adaptive is True:
+            CFL = self.make_cfl(solver, sim_dt, initial_dt=dt)
+
+        # Diagnostics
+        diag = None
+        if self.diagnostics_every is not None:
+            diagnostics = self.diagnostics
+            if diagnostics is None:
+                diagnostics = self.default_diagnostics()
+            filename = None
+            if local is False:
+                filename = f'saves/{save_name}/diagnostics.csv'
+            diag = Diagnostics(solver, diagnostics, self.diagnostics_every,
+                               filename=filename, resume=resume)
+
+        # Steady state monitor
+        monitor = None
+        if self.steady_tol is not None:
+            monitor = SteadyStateMonitor(self.steady_fields(),
+                                         self.steady_tol,
+                                         window=self.steady_window)
+        self.equilibrium_time = None
+
+        # Performance instrumentation
+        perf = PerformanceMonitor(solver, handlers=handlers if local is False
+                                  else ())
+
+        # Output (local, gathered to rank 0)
+        if local is True:
+            n_frames = int(np.ceil((stop_sim_time - start_sim_time)
+                                   / sim_dt)) + 1
+            q_list = SnapshotBuffer(n_frames, dtype=self.snapshot_dtype,
+                                    keep_last=self.keep_last)
+            if self.async_output is True:
+                def sink(grids, sim_time):
+                    q_list.append(grids[0], sim_time)
+                writer = AsyncOutput([q], disk, self.Nphi, self.Nr, self.Lr,
+                                     self.dealias, self.scales, sink,
+                                     max_pending=self.max_pending)
+
+            def save_local():
+                '''Add q to q_list (staged only if async_output)'''
+                with perf.timed('gather'):
+                    if writer is not None:
+                        writer.stage(sim_time=solver.sim_time)
+                    else:
+                        q.change_scales(scales=self.scales)
+                        q_list.append_field(q, solver.sim_time)
+
+            save_local()
+            n_saved = 1
+
+        # Main loop
+        dt_min, dt_max = np.inf, 0
+        while solver.proceed:
+            if adaptive is True:
+                dt = CFL.compute_timestep()
+                dt_min, dt_max = min(dt, dt_min), max(dt, dt_max)
+            perf.step(dt)
+            if solver.iteration % 100 == 0:
+                perf.report(dt)
+            if diag is not None:
+                diag.update(solver, dt)
+            if local is False and checkpoint_every is not None \
+                    and solver.iteration % checkpoint_every == 0:
+                if writer is not None:
+                    writer.flush()  # Snapshots up to checkpoint on disk
+                save_checkpoint(solver, checkpoint_folder, handlers,
+                                keep=self.keep_checkpoints)
+
+            if local is True:
+                if adaptive is True:  # Save on crossing sim_dt cadence
+                    save_now = (solver.sim_time - start_sim_time
+                                >= n_saved * sim_dt)
+                else:
+                    save_now = (solver.iteration % save_every == 0)
+                if save_now:
+                    save_local()
+                    n_saved += 1
+
+            if monitor is not None \
+                    and solver.iteration % self.steady_every == 0 \
+                    and monitor.check():
+                self.equilibrium_time = solver.sim_time
+                logger.info('Steady state at Time=%e (relative change %e)'
+                            % (solver.sim_time, monitor.change))
+                # Final snapshot of the steady state
+                if local is False:
+                    solver.evaluator.evaluate_handlers(
+                        [snapshots], iteration=solver.iteration,
+                        wall_time=solver.wall_time,
+                        sim_time=solver.sim_time, timestep=dt)
+                elif save_now is False:
+                    save_local()
+                break
+
+        if writer is not None:
+            with perf.timed('output'):
+                writer.close()
+
+        if local is False and checkpoint_every is not None:
+            save_checkpoint(solver, checkpoint_folder, handlers,
+                            keep=self.keep_checkpoints)
+
+        if diag is not None:
+            diag.close()
+            self.diagnostics_table = diag.table()
+
+        self.perf = perf.summary()
+        logger.info('%i steps in %.3g s (%.3g it/s, step p50=%.3g s, '
+                    'p99=%.3g s), output %.3g s, peak RSS %.0f MB'
+                    % (self.perf['iterations'], self.perf['wall_time'],
+                       self.perf['it_per_s'],
+                       self.perf.get('step_time_p50', np.nan),
+                       self.perf.get('step_time_p99', np.nan),
+                       self.perf['output_time'], self.perf['peak_rss_MB']))
+
+        end_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        logger.info('Done!')
+        if is_root():
             clear_output(wait=True)
 
-            # Export vars
-            self.sim_ind_list = range(int(stop_sim_time // sim_dt))
+        # Steps taken vs fixed timestep
+        self.iterations = solver.iteration - solver.initial_iteration
+        self.fixed_iterations = int(np.ceil((solver.sim_time - start_sim_time)
+                                            / timestep))
+        if adaptive is True:
+            self.steps_saved = self.fixed_iterations - self.iterations
+            self.dt_range = (dt_min, dt_max)
+            logger.info('Adaptive dt in [%e, %e]: %i steps vs %i at fixed '
+                        'dt=%e (%i saved)'
+                        % (dt_min, dt_max, self.iterations,
+                           self.fixed_iterations, timestep, self.steps_saved))
+
+        # Export vars
+        self.sim_ind_list = range(int(stop_sim_time // sim_dt))
+        if local is False:
             self.save_name = save_name
+            self.class_name = self.__class__.__name__
             self.execution_time = time_str
             self.execution_end_time = end_time
             self.import_previous = True
 
-            with open(f'saves/{save_name}/params.json', 'w') as file:
-                json.dump(self.__dict__, file, default=str)
+            if is_root():
+                with open(f'saves/{save_name}/params.json', 'w') as file:
+                    json.dump(self.__dict__, file, default=str)
+                run_catalog.add(save_name)
 
-        # Main loop (local)
         if local is True:
-            q.change_scales(scales=self.scales)
-            q_list = [np.copy(q['g'])]
-            t_list = [solver.sim_time]
-            while solver.proceed:
-                solver.step(timestep)
-                if solver.iteration % 100 == 0:
-                    logger.info('Iteration=%i, Time=%e, dt=%e'
-                                % (solver.iteration, solver.sim_time,
-                                   timestep))
-                if solver.iteration % save_every == 0:
-                    q.change_scales(scales=self.scales)
-                    q_list.append(np.copy(q['g']))
-                    t_list.append(solver.sim_time)
-
-            logger.info('Done!')
-            clear_output(wait=True)
-
-            # Export vars
-            self.sim_ind_list = range(int(stop_sim_time // sim_dt))
+            self.phi, self.r = global_grids(dist, disk, scales=self.scales)
             self.q_list = q_list
-            self.t_list = t_list
+            self.t_list = q_list.times
+
+    def steady_fields(self):
+        '''Fields checked for steady state (default: q)'''
+        return [self.q]
+
+    def default_diagnostics(self):
+        '''Diagnostics used if diagnostics=None: dict of
+        name -> (expression, reduction), see Diagnostics'''
+        return {}
 
+    def make_cfl(self, solver, sim_dt, initial_dt=None):
+        '''Dedalus CFL on self.velocity (set in make_problem).
+        cfl_max_dt defaults to sim_dt, so no step skips an output.'''
+        max_dt = self.cfl_max_dt
+        if max_dt is None:
+            max_dt = sim_dt
+        if initial_dt is None:
+            initial_dt = self.timestep
+
+        CFL = d3.CFL(solver, initial_dt=initial_dt,
+                     cadence=self.cfl_cadence, safety=self.cfl_safety,
+                     threshold=self.cfl_threshold,
+                     max_change=self.cfl_max_change,
+                     min_change=self.cfl_min_change,
+                     max_dt=max_dt, min_dt=self.cfl_min_dt)
+        CFL.add_velocity(self.velocity)
+        return CFL
+
+    @root_only
     def time_plot(self, plot_t_list=[0, .5, 1], filename=None):
         '''Plots PDE over time. `plot_t_list` is list
         of normalised time in [0,1] to be plotted.'''
+        import matplotlib.pyplot as plt
+        from .fileHandling import time_plot_file
         if self.import_previous is True:
             var_name = self.variable_name
             time_plot_file(self.save_name, plot_t_list=plot_t_list,
@@ -147,14 +460,39 @@ class time_PDE(DedalusSolver):
                 self.plot(q_list[t_ind].T, ax=axs[i],
                           title=f'Time = {t_list[t_ind]:.3}')
             fig.tight_layout()
-            plt.show()
 
             if filename is not None:
                 fig.savefig(filename+'.png', dpi=fig.dpi,
                             bbox_inches='tight')
+            show(fig, filename)
+
+    @root_only
+    def plot_diagnostics(self, names=None, filename=None):
+        '''Plot diagnostics against time. Reads diagnostics.csv for
+        file runs, so also works while the run is still going.'''
+        from .fileHandling import plot_diagnostics_file, plot_diagnostics_table
+        if self.import_previous is True:
+            plot_diagnostics_file(self.save_name, names=names,
+                                  filename=filename)
+        else:
+            plot_diagnostics_table(self.diagnostics_table, names=names,
+                                   filename=filename)
+
+    @root_only
+    def snapshot_errors(self, actual_func, norms=NORMS):
+        '''Error norms of every snapshot of a local run against
+        actual_func(phi, r, t), in one vectorised call.
+        Returns dict of norm name -> array over t_list.'''
+        phi_mesh, r_mesh = np.meshgrid(self.phi, self.r, indexing='ij')
+        t = np.array(self.t_list)[:, np.newaxis, np.newaxis]
+        actual = actual_func(phi_mesh, r_mesh, t)
+        return error_norms(self.q_list.frames, actual, self.Lr,
+                           self.disk.alpha, norms)
 
+    @root_only
     def animate_old(self, pause=0):
         '''Animate PDE over time with global animate function'''
+        from .plotting import animate
         q_list = self.q_list
         t_list = self.t_list
 
@@ -163,29 +501,77 @@ class time_PDE(DedalusSolver):
 
         animate(plot_func, t_list, pause=pause)
 
-    def animate(self, frames=None):
-        '''Animate PDE over time with global animate function'''
+    @root_only
+    def animate(self, frames=None, clim='frame'):
+        '''Animate PDE over time (one figure updated per frame,
+        clim = colour limits, see PolarAnimator)'''
+        from .fileHandling import animate_file
+        from .animator import PolarAnimator
         if self.import_previous is True:
             var_name = self.variable_name
-            animate_file(self.save_name, variable_name=var_name, frames=frames)
+            animate_file(self.save_name, variable_name=var_name, frames=frames,
+                         clim=clim)
+        elif is_headless():
+            name = self.save_name or type(self).__name__
+            return self.save_animation(figure_output.path(name),
+                                       frames=frames, clim=clim)
         else:
-            q_list = self.q_list
-            t_list = self.t_list
-            t_steps = len(t_list)
+            animator = PolarAnimator(self.phi, self.r, self.q_list,
+                                     self.t_list, clim=clim)
+            ani2 = animator.animation(frames)
+            animator.close()
+            figure_output.display_animation(ani2)
 
-            if frames is None:
-                frames = range(t_steps)
+    @root_only
+    def export_figures(self, folder=None, plot_t_list=[0, .5, 1],
+                       frames=None, processes=1, clim='fixed',
+                       video=False):
+        '''Write time plot, diagnostics and animation frames (or
+        animation.mp4 if video=True) to folder (default figures/name)
+        in one headless pass. Frames are rendered serially unless
+        processes is given (see save_animation). Returns folder.'''
+        name = self.save_name or type(self).__name__
+        if folder is None:
+            folder = os.path.join(figure_output.folder, name)
+        os.makedirs(folder, exist_ok=True)
+        with headless(folder):
+            self.time_plot(plot_t_list, filename=os.path.join(folder,
+                                                              'time_plot'))
+            has_diagnostics = (os.path.exists(f'saves/{name}/diagnostics.csv')
+                               if self.import_previous is True else
+                               getattr(self, 'diagnostics_table', None)
+                               is not None)
+            if has_diagnostics:
+                self.plot_diagnostics(filename=os.path.join(folder,
+                                                            'diagnostics'))
+            animation = 'animation.mp4' if video else 'frames'
+            self.save_animation(os.path.join(folder, animation),
+                                frames=frames, processes=processes, clim=clim)
+        return folder
 
-            def plot_func(k):
-                self.plot(q_list[k].T, ax=ax[0], title=
-                          f'Time: {t_list[k]:.3f}', cax=ax[1])
-
-            fig, ax = plt.subplots(1, 3, width_ratios=[10, 1, 1],
-                                   figsize=(6, 5))
-            ax[2].axis('off')
-            ani2 = matplotlib.animation.FuncAnimation(fig, plot_func,
-                                                      frames=frames)
-            plt.close()
+    @root_only
+    def save_animation(self, filename, frames=None, processes=1, fps=10,
+                       clim='fixed', cmap=None, image_size=None):
+        '''Render frames to filename: an .mp4 video (needs ffmpeg) or
+        otherwise a folder of PNGs. processes > 1 (None = all cores)
+        renders on a spawn pool (needs a `__main__` guard in the
+        script, see render_frames); file runs are then streamed from
+        disk by each worker. image_size = n draws n-by-n images (see
+        PolarRegrid) instead of a pcolormesh.'''
+        from .animator import render_frames, render_mp4
+        if self.import_previous is True:
+            var_name = self.variable_name or 'q'
+            reader = snapshot_reader(self.save_name, var_name)
+            phi, r, q_list, t_list = reader.phi, reader.r, reader, reader.times
+            source = (self.save_name, var_name)
+        else:
+            phi, r, q_list, t_list = self.phi, self.r, self.q_list, self.t_list
+            source = None
 
-            video = HTML(ani2.to_jshtml())
-            display(video)
\ No newline at end of file
+        if filename.endswith('.mp4'):
+            return render_mp4(filename, phi, r, q_list, t_list, frames,
+                              fps=fps, processes=processes, source=source,
+                              clim=clim, cmap=cmap, image_size=image_size)
+        return render_frames(phi, r, q_list, t_list, filename, frames,
+                             processes=processes, source=source, clim=clim,
+                             cmap=cmap, image_size=image_size)
\ No newline at end of file
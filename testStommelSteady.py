@@ -0,0 +1,23 @@
+from spectralGFD import *
+
+# Params
+Nphi, Nr = 128, 128  # Grid spacing
+Lr = 2e6
+dealias = 2
+
+# Constants
+constants = {
+    'F' : 0.1,
+    'H' : 500,
+    'r0' : 2e-7,
+    'beta' : 2e-11,
+    'nu' : 400,
+    'rho0' : 1000,
+    'Q_shift' : 0.01}
+
+# Solve viscous case, then continue down to nu = 80
+stommel_gyre = stommel_steady(Nphi, Nr, Lr=Lr, dealias=dealias, **constants)
+for params, psig, zetag in stommel_gyre.continuation([{'nu': nu}
+                                                      for nu in [200, 120, 80]]):
+    print(params, 'Newton iterations:', stommel_gyre.newton_iterations)
+stommel_gyre.plot_result(title=r'Steady $\psi$, $\nu=80$')